@@ -1,20 +1,146 @@
-from backend.dbpia_handler import fetch_real_abstract
+from backend.dbpia_handler import KEYWORD_SEARCH_WORKERS, iter_real_abstracts
+from backend.disk_cache import CACHE_DIR, DiskCache
+import json
 import os
+import queue
 import re
-from typing import List, Dict, Any
-from openai import OpenAI
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import List, Dict, Any, Iterator
+from backend.resources import get_openai_client, shared_resource
+from backend.tracing import bind_context, record_usage, span
 
-def extract_keywords_with_openai(query: str) -> List[str]:
+# 키워드 추출 결과 캐시 설정
+KEYWORD_CACHE_PATH = os.path.join(CACHE_DIR, "keywords.sqlite")
+KEYWORD_CACHE_TTL = 7 * 24 * 3600
+KEYWORD_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# use_local_fast_path=True일 때 이 개수 이하의 명사만 있는 짧은 쿼리는 LLM 없이 바로 키워드로 사용
+LOCAL_FAST_PATH_MAX_NOUNS = 2
+
+# 명사 뒤에 붙는 조사/접미사 (긴 것부터 제거). '이', '가', '는', '들', '도', '만', '과', '로'는
+# 명사 끝 글자와 겹치는 경우가 많아('비만', '제도', '효과') 제외
+KOREAN_SUFFIXES = sorted([
+    "에서의", "으로의", "에서", "에게", "으로", "부터", "까지", "처럼", "보다",
+    "과의", "와의", "에의", "적인", "적", "의", "을", "를", "은", "에", "와",
+], key=len, reverse=True)
+
+# 조사/접미사를 뗀 뒤 남아야 하는 최소 글자 수
+MIN_NOUN_LENGTH = 2
+
+# 키워드로 의미가 없는 단어
+KEYWORD_STOPWORDS = {
+    "대한", "관한", "위한", "통한", "따른", "대하여", "관하여", "및", "등", "그", "이", "저", "것", "수",
+    "연구", "분석", "고찰", "탐구", "방법", "방안", "관계", "관련", "어떻게", "왜", "무엇",
+    "기반", "활용", "이용", "통해", "법",
+}
+
+# 용언(동사/형용사) 활용형 어미. 이런 어절은 명사가 아니므로 제외
+VERB_ENDINGS = ("하는", "되는", "하기", "하다", "는가", "는지", "던", "할", "한다")
+
+
+@shared_resource
+def _get_keyword_cache() -> DiskCache:
+    """키워드 추출 결과 캐시를 반환합니다."""
+    return DiskCache(KEYWORD_CACHE_PATH, ttl_seconds=KEYWORD_CACHE_TTL, max_bytes=KEYWORD_CACHE_MAX_BYTES)
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키로 쓰기 위해 쿼리를 정규화합니다 (유니코드 정규화, 소문자, 문장부호 제거, 공백 정리)."""
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = re.sub(r"[^\w\s]", " ", query)
+    return " ".join(query.split())
+
+
+def extract_keywords_locally(query: str, max_keywords: int = 3) -> List[str]:
+    """
+    LLM 없이 쿼리에서 명사 후보를 뽑아 키워드로 사용합니다.
+
+    어절에서 조사와 접미사를 떼어내고 불용어를 제외한 뒤, 긴 단어를 우선하여
+    원래 순서대로 최대 max_keywords개를 반환합니다. 떼고 남는 글자가 MIN_NOUN_LENGTH보다
+    짧아지면 떼지 않습니다.
+
+    Args:
+        query: 사용자가 입력한 검색 쿼리
+        max_keywords: 최대 키워드 수
+
+    Returns:
+        추출된 키워드 리스트
+    """
+    nouns = []
+    for token in normalize_query(query).split():
+        if token.endswith(VERB_ENDINGS) and token not in KEYWORD_STOPWORDS:
+            continue
+        for suffix in KOREAN_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_NOUN_LENGTH:
+                token = token[:-len(suffix)]
+                break
+        if token and token not in KEYWORD_STOPWORDS and token not in nouns:
+            nouns.append(token)
+
+    if len(nouns) <= max_keywords:
+        return nouns
+    # 긴 단어일수록 구체적인 주제어일 가능성이 높음
+    selected = set(sorted(nouns, key=len, reverse=True)[:max_keywords])
+    return [noun for noun in nouns if noun in selected]
+
+
+def extract_keywords_with_openai(
+    query: str,
+    use_cache: bool = True,
+    use_local: bool = True,
+    use_local_fast_path: bool = False
+) -> List[str]:
     """
     OpenAI를 사용하여 쿼리에서 중요한 키워드 2-3개를 추출합니다.
+
+    정규화한 쿼리 기준으로 결과를 디스크에 캐시하며, OpenAI 호출이 실패하면 로컬 추출 결과를 사용합니다.
+    use_local_fast_path를 켜면 명사가 몇 개 안 되는 짧은 쿼리는 로컬 추출기로 바로 처리합니다.
     
     Args:
         query: 사용자가 입력한 검색 쿼리
+        use_cache: 디스크 캐시 사용 여부
+        use_local: OpenAI 호출이 실패했을 때 로컬 추출 결과로 대체할지 여부
+        use_local_fast_path: 짧은 쿼리를 OpenAI 호출 없이 로컬 추출기로 처리할지 여부
         
     Returns:
         추출된 키워드 리스트
     """
-    client = OpenAI()
+    with span("keyword_extraction") as stage:
+        cache_key = normalize_query(query)
+        if use_cache:
+            cached = _get_keyword_cache().get(cache_key)
+            if cached is not None:
+                stage.set(source="cache")
+                return json.loads(cached)
+
+        if use_local_fast_path:
+            local_keywords = extract_keywords_locally(query)
+            if 0 < len(local_keywords) <= LOCAL_FAST_PATH_MAX_NOUNS:
+                stage.set(source="local")
+                return local_keywords
+
+        try:
+            keywords = _extract_keywords_remote(query)
+        except Exception as e:
+            local_keywords = extract_keywords_locally(query) if use_local else []
+            if not local_keywords:
+                raise
+            print(f"❌ 키워드 추출 실패, 로컬 추출 결과 사용: {e}")
+            stage.set(source="local_fallback")
+            return local_keywords
+
+        stage.set(source="openai")
+        if use_cache and keywords:
+            _get_keyword_cache().set(cache_key, json.dumps(keywords, ensure_ascii=False).encode("utf-8"))
+        return keywords
+
+
+def _extract_keywords_remote(query: str) -> List[str]:
+    """OpenAI 채팅 모델로 키워드를 추출합니다."""
+    client = get_openai_client()
     
     prompt = f"""다음 연구 주제에서 가장 중요한 키워드 2-3개만 추출해주세요.
 키워드는 연구의 핵심 주제를 나타내는 명사여야 합니다.
@@ -31,12 +157,68 @@ def extract_keywords_with_openai(query: str) -> List[str]:
         temperature=0.3,
         max_tokens=100
     )
+    record_usage(response.usage)
     
     keywords = response.choices[0].message.content.strip().split(',')
     keywords = [kw.strip() for kw in keywords if kw.strip()]
     
     return keywords
 
+def iter_papers_by_keywords(keywords: List[str], api_key: str) -> Iterator[Dict[str, Any]]:
+    """
+    여러 키워드로 DBpia 검색을 동시에 실행하고, 중복 없는 논문을 찾는 즉시 내보냅니다.
+
+    가장 느린 키워드를 기다리지 않고 먼저 찾은 논문부터 화면에 그리거나 임베딩할 수 있습니다.
+    이터레이터를 중간에 닫으면 남은 검색은 더 이상 결과를 가져오지 않습니다.
+    
+    Args:
+        keywords: 검색할 키워드 리스트
+        api_key: DBpia API 키
+        
+    Returns:
+        제목 기준으로 중복을 제거한 논문 이터레이터
+    """
+    if not keywords:
+        return
+
+    results: "queue.Queue" = queue.Queue()
+    stop = threading.Event()
+    done_marker = object()
+
+    def search(keyword: str):
+        try:
+            with closing(iter_real_abstracts(keyword, api_key)) as papers:
+                for paper in papers:
+                    if stop.is_set():
+                        break
+                    results.put(paper)
+        except Exception as e:
+            print(f"❌ 키워드 검색 실패: {keyword} ({e})")
+        finally:
+            results.put(done_marker)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(KEYWORD_SEARCH_WORKERS, len(keywords))))
+    try:
+        for keyword in keywords:
+            executor.submit(bind_context(search), keyword)
+
+        # 중복 제거 (공백을 정리한 제목 기준)
+        seen_titles = set()
+        remaining = len(keywords)
+        while remaining:
+            paper = results.get()
+            if paper is done_marker:
+                remaining -= 1
+                continue
+            title = ' '.join(paper['title'].split())
+            if title not in seen_titles:
+                seen_titles.add(title)
+                yield paper
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def search_papers_by_keywords(query: str, api_key: str) -> Dict[str, Any]:
     """
     주어진 쿼리에서 키워드를 추출하고, 각 키워드에 대해 논문을 검색합니다.
@@ -51,21 +233,11 @@ def search_papers_by_keywords(query: str, api_key: str) -> Dict[str, Any]:
     # OpenAI를 사용하여 중요한 키워드 추출
     keywords = extract_keywords_with_openai(query)
     
-    # 각 키워드에 대해 논문 검색
-    papers = []
-    for keyword in keywords:
-        papers.extend(fetch_real_abstract(keyword, api_key))
-    
-    # 중복 제거
-    seen_titles = set()
-    unique_papers = []
-    for paper in papers:
-        if paper['title'] not in seen_titles:
-            seen_titles.add(paper['title'])
-            unique_papers.append(paper)
+    # 키워드별로 동시에 검색하며 중복 제거
+    unique_papers = list(iter_papers_by_keywords(keywords, api_key))
     
     return {
         'papers': unique_papers,
         'keywords': keywords,
         'original_query': query
-    }
\ No newline at end of file
+    }
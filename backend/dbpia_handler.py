@@ -1,10 +1,170 @@
 # backend/dbpia_handler.py
+import hashlib
+import os
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import xml.etree.ElementTree as ET
 
-def fetch_real_abstract(query: str, api_key: str):
-    url = "https://api.dbpia.co.kr/v2/search/search.xml"
+from backend.disk_cache import CACHE_DIR, DiskCache
+from backend.resources import shared_resource
+from backend.tracing import bind_context, span
+
+SEARCH_URL = "https://api.dbpia.co.kr/v2/search/search.xml"
+
+# 상세 페이지 동시 요청 수와 요청별 타임아웃(초)
+DETAIL_FETCH_WORKERS = 5
+REQUEST_TIMEOUT = 10
+# 키워드별 DBpia 검색 동시 실행 수 (backend_utils.iter_papers_by_keywords)
+KEYWORD_SEARCH_WORKERS = 3
+# 세션을 쓰는 최대 동시 요청 수: 키워드마다 상세 페이지를 DETAIL_FETCH_WORKERS개씩 동시에 받음
+HTTP_POOL_MAXSIZE = KEYWORD_SEARCH_WORKERS * DETAIL_FETCH_WORKERS
+# 키워드당 수집할 최대 초록 수
+MAX_ABSTRACTS = 5
+
+# 응답 캐시 설정
+HTTP_CACHE_PATH = os.path.join(CACHE_DIR, "dbpia_http.sqlite")
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+SEARCH_CACHE_TTL = 24 * 3600
+DETAIL_CACHE_TTL = 30 * 24 * 3600
+# 초록이 없던 상세 페이지(네거티브 캐시)는 더 짧게 유지
+NEGATIVE_CACHE_TTL = 7 * 24 * 3600
+# 캐시 키에서 제외할 파라미터 (응답 내용에 영향을 주지 않음)
+CACHE_IGNORED_PARAMS = {"key"}
+
+
+@shared_resource
+def _get_session() -> requests.Session:
+    """커넥션 풀을 공유하는 requests 세션을 반환합니다."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@shared_resource
+def _get_cache() -> DiskCache:
+    """DBpia 응답 캐시를 반환합니다."""
+    return DiskCache(HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_BYTES)
+
+
+def make_cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    URL과 파라미터를 정규화하여 캐시 키를 만듭니다.
+
+    스킴과 호스트는 소문자로, 쿼리 파라미터는 정렬하여 합치며
+    API 키처럼 응답에 영향을 주지 않는 파라미터는 제외합니다.
+    """
+    parts = urlsplit(url.strip())
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items() if v is not None)
+    query = sorted((k, v) for k, v in query if k not in CACHE_IGNORED_PARAMS)
+    normalized = urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or "/",
+        urlencode(query),
+        "",
+    ))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _fetch_search_xml(params: Dict[str, Any], use_cache: bool) -> bytes:
+    """검색 API 응답(XML)을 가져옵니다. 캐시에 있으면 네트워크 요청을 생략합니다."""
+    key = make_cache_key(SEARCH_URL, params)
+    with span("dbpia_search", cached=False) as stage:
+        if use_cache:
+            cached = _get_cache().get(key)
+            if cached is not None:
+                stage.set(cached=True)
+                stage.add("bytes", len(cached))
+                return cached
+
+        response = _get_session().get(SEARCH_URL, params=params, timeout=REQUEST_TIMEOUT)
+        stage.set(status=str(response.status_code))
+        stage.add("bytes", len(response.content))
+        if use_cache and response.status_code == 200:
+            _get_cache().set(key, response.content, ttl_seconds=SEARCH_CACHE_TTL)
+        return response.content
+
+
+def _fetch_detail_abstract(link: str, use_cache: bool = True) -> Optional[str]:
+    """
+    상세 페이지에서 초록을 가져옵니다. 초록이 없으면 None을 반환합니다.
+
+    파싱한 초록을 캐시하며, 초록이 없던 페이지는 빈 값으로 저장해(네거티브 캐시)
+    다시 요청하거나 파싱하지 않습니다.
+    """
+    key = make_cache_key(link)
+    with span("detail_scrape", cached=False) as stage:
+        if use_cache:
+            cached = _get_cache().get(key)
+            if cached is not None:
+                stage.set(cached=True, found=bool(cached))
+                stage.add("bytes", len(cached))
+                return cached.decode("utf-8") or None
+
+        detail_response = _get_session().get(link, timeout=REQUEST_TIMEOUT)
+        stage.set(status=str(detail_response.status_code))
+        stage.add("bytes", len(detail_response.content))
+        if detail_response.status_code != 200:
+            # 일시적인 오류일 수 있으므로 캐시하지 않음
+            return None
+        soup = BeautifulSoup(detail_response.text, 'html.parser')
+        abstract_div = soup.find('div', class_='abstractTxt')
+        abstract = None
+        if abstract_div and abstract_div.text.strip() and abstract_div.text.strip() != "등록된 정보가 없습니다.":
+            abstract = abstract_div.text.strip()
+        stage.set(found=abstract is not None)
+
+        if use_cache:
+            if abstract:
+                _get_cache().set(key, abstract.encode("utf-8"), ttl_seconds=DETAIL_CACHE_TTL)
+            else:
+                _get_cache().set(key, b"", ttl_seconds=NEGATIVE_CACHE_TTL)
+        return abstract
+
+
+def fetch_real_abstract(query: str, api_key: str, max_workers: int = DETAIL_FETCH_WORKERS, use_cache: bool = True):
+    """
+    DBpia에서 논문을 검색하고, 초록이 있는 논문을 최대 MAX_ABSTRACTS개까지 반환합니다.
+
+    상세 페이지는 최대 max_workers개까지 동시에 요청하며, 초록이 충분히 모이면
+    아직 시작하지 않은 요청은 취소합니다.
+
+    Args:
+        query: 검색어
+        api_key: DBpia API 키
+        max_workers: 상세 페이지 동시 요청 수 (1이면 순차 요청)
+        use_cache: 디스크 응답 캐시 사용 여부
+
+    Returns:
+        초록을 포함한 논문 정보 리스트 (검색 결과 순서 유지)
+    """
+    found = dict(_iter_abstracts(query, api_key, max_workers, use_cache))
+    return [found[position] for position in sorted(found)]
+
+
+def iter_real_abstracts(query: str, api_key: str, max_workers: int = DETAIL_FETCH_WORKERS, use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    fetch_real_abstract와 같지만, 초록을 찾는 즉시 논문을 하나씩 내보냅니다 (완료 순서).
+
+    이터레이터를 중간에 닫으면 남은 상세 페이지 요청은 취소됩니다.
+    """
+    with closing(_iter_abstracts(query, api_key, max_workers, use_cache)) as found:
+        for _, paper_info in found:
+            yield paper_info
+
+
+def _iter_abstracts(query: str, api_key: str, max_workers: int, use_cache: bool) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """검색 결과에서의 위치와 함께, 초록을 찾은 논문을 완료 순서대로 내보냅니다."""
     params = {
         "key": api_key,
         "searchall": query,
@@ -12,10 +172,9 @@ def fetch_real_abstract(query: str, api_key: str):
         "pagecount": 20  # 무료 논문을 찾기 위해 더 많은 결과를 가져옴
     }
 
-    response = requests.get(url, params=params)
-    root = ET.fromstring(response.content)
-    
-    papers = []
+    root = ET.fromstring(_fetch_search_xml(params, use_cache))
+
+    candidates = []
     try:
         # 모든 item 요소를 찾아서 처리
         for item in root.findall(".//item"):
@@ -24,36 +183,45 @@ def fetch_real_abstract(query: str, api_key: str):
             is_free = item.findtext("free_yn") == "Y"
             has_preview = item.findtext("preview_yn") == "Y"
             preview_url = item.findtext("preview") if has_preview else None
-            
-            paper_info = {
-                "title": title.replace("<!HS>", "").replace("<!HE>", ""),  # 하이라이트 태그 제거
-                "link": link,
-                "is_free": is_free,
-                "has_preview": has_preview,
-                "preview_url": preview_url,
-                "abstract": None
-            }
-            
+
             # 무료 논문이거나 미리보기가 있는 경우에만 시도
             if is_free or has_preview:
-                try:
-                    detail_response = requests.get(link)
-                    if detail_response.status_code == 200:
-                        soup = BeautifulSoup(detail_response.text, 'html.parser')
-                        abstract_div = soup.find('div', class_='abstractTxt')
-                        if abstract_div and abstract_div.text.strip() and abstract_div.text.strip() != "등록된 정보가 없습니다.":
-                            paper_info["abstract"] = abstract_div.text.strip()
-                            papers.append(paper_info)
-                            print(f"✅ {'무료' if is_free else '미리보기'} 논문 발견: {title}")
-                            
-                            # 10개가 되면 중단
-                            if len(papers) >= 5:
-                                break
-                except Exception as e:
-                    print(f"❌ 상세 페이지 파싱 실패: {link}")
-                    continue
-                
-        return papers
+                candidates.append({
+                    "title": title.replace("<!HS>", "").replace("<!HE>", ""),  # 하이라이트 태그 제거
+                    "link": link,
+                    "is_free": is_free,
+                    "has_preview": has_preview,
+                    "preview_url": preview_url,
+                    "abstract": None
+                })
     except Exception as e:
         print(f"❌ 파싱 실패: {e}")
-        return []
+        return
+
+    found_count = 0
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        futures = {
+            executor.submit(bind_context(_fetch_detail_abstract), paper_info["link"], use_cache): position
+            for position, paper_info in enumerate(candidates)
+        }
+        for future in as_completed(futures):
+            position = futures[future]
+            paper_info = candidates[position]
+            try:
+                abstract = future.result()
+            except Exception:
+                print(f"❌ 상세 페이지 파싱 실패: {paper_info['link']}")
+                continue
+            if abstract:
+                paper_info["abstract"] = abstract
+                found_count += 1
+                print(f"✅ {'무료' if paper_info['is_free'] else '미리보기'} 논문 발견: {paper_info['title']}")
+                yield position, paper_info
+
+                # 목표 개수에 도달하면 중단
+                if found_count >= MAX_ABSTRACTS:
+                    break
+    finally:
+        # 대기 중인 요청은 취소하고, 진행 중인 요청은 기다리지 않음
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,134 @@
+# backend/disk_cache.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CACHE_DIR = "cache"
+
+
+class DiskCache:
+    """
+    SQLite 기반의 영속 키-값 캐시입니다.
+
+    항목마다 만료 시각(TTL)을 두고, 전체 크기가 max_bytes를 넘으면
+    가장 오래 사용되지 않은 항목부터 제거합니다(LRU).
+    여러 스레드와 Streamlit 프로세스가 같은 파일을 공유할 수 있도록 WAL 모드를 사용합니다.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: 캐시 파일 경로
+            ttl_seconds: 기본 유효 시간(초). None이면 만료되지 않음
+            max_bytes: 저장할 값의 총 크기 상한
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """키에 해당하는 값을 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """여러 키를 한 번에 조회합니다. 찾은 항목만 딕셔너리로 반환합니다."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        now = time.time()
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            # SQLite 변수 개수 제한을 피하기 위해 나눠서 조회
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value, expires_at FROM entries WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                expired = []
+                for key, value, expires_at in rows:
+                    if expires_at is not None and expires_at <= now:
+                        expired.append((key,))
+                    else:
+                        found[key] = bytes(value)
+                if expired:
+                    self._conn.executemany("DELETE FROM entries WHERE key = ?", expired)
+            if found:
+                self._conn.executemany(
+                    "UPDATE entries SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+        return found
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None):
+        """값을 저장합니다. ttl_seconds를 생략하면 캐시의 기본 TTL을 사용합니다."""
+        self.set_many([(key, value)], ttl_seconds=ttl_seconds)
+
+    def set_many(self, items: Iterable[Tuple[str, bytes]], ttl_seconds: Optional[float] = None):
+        """여러 값을 하나의 트랜잭션으로 저장합니다."""
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = now + ttl if ttl is not None else None
+        rows = [(key, sqlite3.Binary(value), len(value), expires_at, now) for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, key: str):
+        """항목을 삭제합니다."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        """모든 항목을 삭제합니다."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def total_bytes(self) -> int:
+        """저장된 값의 총 크기를 반환합니다."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self, now: float):
+        """만료된 항목을 지우고, 크기 상한을 넘으면 LRU 순서로 제거합니다."""
+        self._conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims: List[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append(key)
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
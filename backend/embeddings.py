@@ -0,0 +1,156 @@
+# backend/embeddings.py
+import hashlib
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from openai import OpenAI
+
+from backend.disk_cache import CACHE_DIR, DiskCache
+from backend.resources import get_openai_client, shared_resource
+from backend.tracing import record_usage
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSION = 1536
+
+# 요청 하나에 담을 최대 텍스트 수와 토큰 수
+EMBEDDING_BATCH_SIZE = 64
+EMBEDDING_MAX_BATCH_TOKENS = 100_000
+
+# 임베딩 캐시 설정
+EMBEDDING_CACHE_PATH = os.path.join(CACHE_DIR, "embeddings.sqlite")
+EMBEDDING_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+class OpenAIEmbedder:
+    """OpenAI Embedding API를 사용하는 임베딩 백엔드입니다."""
+
+    def __init__(self, model: str = EMBEDDING_MODEL, client: Optional[OpenAI] = None):
+        self.model = model
+        self.client = client or get_openai_client()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """텍스트 목록을 한 번의 요청으로 임베딩합니다. 입력 순서대로 행을 반환합니다."""
+        response = self.client.embeddings.create(model=self.model, input=list(texts))
+        record_usage(response.usage)
+        data = sorted(response.data, key=lambda item: item.index)
+        return np.array([item.embedding for item in data], dtype='float32')
+
+
+class LocalEmbedder:
+    """
+    네트워크 없이 동작하는 임베딩 백엔드입니다.
+
+    문자 바이그램을 해시하여 고정 차원 벡터로 만들기 때문에 결정적이며,
+    비슷한 텍스트끼리는 비슷한 벡터가 나옵니다. 오프라인 테스트와 벤치마크용입니다.
+    """
+
+    model = "local-hash-bigram"
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION, latency_seconds: float = 0.0):
+        """
+        Args:
+            dimension: 벡터 차원
+            latency_seconds: 요청마다 흉내낼 지연 시간(초)
+        """
+        self.dimension = dimension
+        self.latency_seconds = latency_seconds
+        self.request_count = 0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """텍스트 목록을 임베딩합니다. 호출 한 번을 요청 한 번으로 취급합니다."""
+        self.request_count += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        vectors = np.zeros((len(texts), self.dimension), dtype='float32')
+        for row, text in enumerate(texts):
+            text = text or " "
+            grams = [text[i:i + 2] for i in range(max(1, len(text) - 1))]
+            for gram in grams:
+                digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimension
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vectors[row, bucket] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+def get_default_embedder():
+    """환경 변수 EMBEDDING_BACKEND에 따라 임베딩 백엔드를 생성합니다 ('openai' 또는 'local')."""
+    if os.getenv("EMBEDDING_BACKEND", "openai").lower() == "local":
+        return LocalEmbedder()
+    return OpenAIEmbedder()
+
+
+def iter_batches(
+    token_counts: Sequence[int],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    max_batch_tokens: int = EMBEDDING_MAX_BATCH_TOKENS
+) -> Iterator[List[int]]:
+    """
+    텍스트 인덱스를 요청 단위 배치로 묶습니다.
+
+    배치마다 텍스트 수는 batch_size 이하, 토큰 합계는 max_batch_tokens 이하가 되도록 하며,
+    혼자서 예산을 넘는 텍스트는 단독 배치로 보냅니다.
+
+    Args:
+        token_counts: 텍스트별 토큰 수
+        batch_size: 배치당 최대 텍스트 수
+        max_batch_tokens: 배치당 최대 토큰 수
+
+    Returns:
+        원래 순서를 유지하는 인덱스 배치들의 이터레이터
+    """
+    batch: List[int] = []
+    batch_tokens = 0
+    for index, tokens in enumerate(token_counts):
+        if batch and (len(batch) >= batch_size or batch_tokens + tokens > max_batch_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(index)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+class EmbeddingCache:
+    """
+    (모델, 텍스트) 해시를 키로 하는 영속 임베딩 캐시입니다.
+
+    같은 초록이 여러 검색과 벡터 저장소에서 반복되므로, 한 번 계산한 벡터를
+    모든 저장소가 공유합니다. 용량을 넘으면 LRU 순서로 제거됩니다.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+        self._cache = DiskCache(path, max_bytes=max_bytes)
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """모델 이름과 텍스트로 캐시 키를 만듭니다."""
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: Sequence[str], dimension: int) -> Dict[int, np.ndarray]:
+        """캐시에 있는 벡터를 {텍스트 인덱스: 벡터} 형태로 반환합니다."""
+        keys = [self.make_key(model, text) for text in texts]
+        found = self._cache.get_many(keys)
+        vectors = {}
+        for index, key in enumerate(keys):
+            value = found.get(key)
+            if value is not None and len(value) == dimension * 4:
+                vectors[index] = np.frombuffer(value, dtype='float32')
+        return vectors
+
+    def set_many(self, model: str, texts: Sequence[str], vectors: np.ndarray):
+        """텍스트별 벡터를 캐시에 저장합니다."""
+        self._cache.set_many(
+            (self.make_key(model, text), np.asarray(vector, dtype='float32').tobytes())
+            for text, vector in zip(texts, vectors)
+        )
+
+
+@shared_resource
+def get_embedding_cache() -> EmbeddingCache:
+    """모든 저장소와 세션이 함께 쓰는 임베딩 캐시를 반환합니다."""
+    return EmbeddingCache()
@@ -1,26 +1,42 @@
-from openai import OpenAI
-from typing import List, Dict
+from backend.resources import get_encoding, get_openai_client
+from backend.tracing import record_usage, span, start_span
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
 from .vector_store import PaperVectorStore
 import os
 
-def generate_fake_paper(
-    vector_store: PaperVectorStore,
-    query: str,
-    max_tokens: int = 4096
-) -> Dict[str, str]:
+# 생성 모델 설정
+GENERATION_MODEL = "gpt-4.1-nano"
+SYSTEM_PROMPT = "You are a professional academic researcher with a good sense of humor. Write a detailed academic paper in Korean with fun references."
+# 이 모델을 모르는 tiktoken 버전에서 토큰 수를 추정할 때 쓰는 같은 계열 모델
+TOKEN_ESTIMATE_FALLBACK_MODEL = "gpt-4o"
+# 채팅 형식이 메시지마다, 그리고 응답 앞에 덧붙이는 토큰 수
+CHAT_TOKENS_PER_MESSAGE = 3
+CHAT_REPLY_PRIMING_TOKENS = 3
+
+
+def estimate_chat_usage(messages: List[Dict[str, str]], completion: str) -> SimpleNamespace:
     """
-    벡터 저장소에서 유사한 논문을 검색하고, 이를 기반으로 새로운 논문을 생성합니다.
-    
-    Args:
-        vector_store: 논문 벡터 저장소
-        query: 검색 쿼리
-        max_tokens: 최대 토큰 수
-        
-    Returns:
-        생성된 논문의 각 섹션을 포함하는 딕셔너리
+    tiktoken으로 채팅 요청의 토큰 사용량을 추정합니다. 응답의 usage와 같은 필드를 가집니다.
+
+    openai 1.12.0은 스트리밍 응답에 usage를 주지 않으므로 스트리밍 생성에서 대신 씁니다.
     """
-    client = OpenAI()
-    
+    try:
+        encoding = get_encoding(GENERATION_MODEL)
+    except KeyError:
+        encoding = get_encoding(TOKEN_ESTIMATE_FALLBACK_MODEL)
+    encoded = encoding.encode_batch([message["content"] for message in messages] + [completion])
+    prompt_tokens = sum(len(tokens) + CHAT_TOKENS_PER_MESSAGE for tokens in encoded[:-1]) + CHAT_REPLY_PRIMING_TOKENS
+    completion_tokens = len(encoded[-1])
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+    )
+
+
+def _build_prompt(vector_store: PaperVectorStore, query: str, max_tokens: int) -> str:
+    """유사 논문을 검색해 컨텍스트를 만들고 생성 프롬프트를 구성합니다."""
     # 유사한 논문 검색
     similar_papers = vector_store.search_similar(query, k=5)
     
@@ -28,7 +44,7 @@ def generate_fake_paper(
     context = vector_store.get_context_within_token_limit(similar_papers, max_tokens // 2)
     
     # 프롬프트 구성
-    prompt = f"""다음은 주제 '{query}'와 관련된 논문 스타일의 텍스트입니다.  
+    return f"""다음은 주제 '{query}'와 관련된 논문 스타일의 텍스트입니다.  
 이를 바탕으로 **새롭고 창의적인 학술 논문**을 작성해주세요.  
 논문은 다음 마크다운 형식을 따라야 합니다:
 
@@ -67,135 +83,154 @@ def generate_fake_paper(
 위 형식에 맞춰 새롭고 독창적인 논문을 작성해주세요.
 각 섹션은 반드시 내용을 포함해야 하며, 섹션 제목과 내용을 명확히 구분해주세요."""
 
-    # GPT-4.1-nano 모델로 논문 생성
-    response = client.chat.completions.create(
-        model="gpt-4.1-nano",
-        messages=[
-            {"role": "system", "content": "You are a professional academic researcher with a good sense of humor. Write a detailed academic paper in Korean with fun references."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.7,
-        max_tokens=max_tokens
-    )
-    
-    # 응답 파싱
-    content = response.choices[0].message.content
-    
-    # 각 섹션 추출
-    sections = {
-        "title": "",
-        "abstract": "",
-        "introduction": "",
-        "background": "",
-        "method": "",
-        "results": "",
-        "conclusion": "",
-        "references": ""
-    }
-    
-    # 섹션 분리
-    current_section = None
-    current_content = []
-    
-    lines = content.split('\n')
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
+
+
+# 섹션 제목 접두사 → 섹션 이름 (위에서부터 검사)
+SECTION_HEADINGS = [
+    (('## 초록',), 'abstract'),
+    (('## 1.', '## 서론'), 'introduction'),
+    (('## 2.', '## 이론'), 'background'),
+    (('## 3.', '## 연구 방법'), 'method'),
+    (('## 4.', '## 연구 결과'), 'results'),
+    (('## 5.', '## 결론'), 'conclusion'),
+    (('## 참고문헌',), 'references'),
+]
+SECTION_NAMES = ['title'] + [name for _, name in SECTION_HEADINGS]
+
+
+class PaperSectionParser:
+    """
+    생성된 마크다운 논문을 섹션별로 나누는 한 번 훑기(single-pass) 파서입니다.
+
+    텍스트를 조각 단위로 feed()에 넣으면 완성된 줄마다 상태를 바꾸며 이벤트를 돌려줍니다.
+    섹션 안의 빈 줄은 문단 구분으로 유지하고, 알 수 없는 '## ' 제목 아래 내용은 버립니다.
+
+    이벤트 종류:
+        {"type": "section", "section": ...}: 새 섹션의 시작 (제목은 "text"에 포함)
+        {"type": "line", "section": ..., "text": ...}: 현재 섹션의 한 줄 ("text"가 빈 문자열이면 문단 구분)
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._section: Optional[str] = None
+        self._blank_pending = False
+        self._lines: Dict[str, List[str]] = {name: [] for name in SECTION_NAMES}
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """텍스트 조각을 넣고, 그 사이에 완성된 줄에서 나온 이벤트를 반환합니다."""
+        self._buffer += chunk
+        if '\n' not in chunk:
+            return []
+        *lines, self._buffer = self._buffer.split('\n')
+        events: List[Dict[str, Any]] = []
+        for line in lines:
+            self._handle_line(line, events)
+        return events
+
+    def close(self) -> List[Dict[str, Any]]:
+        """남은 마지막 줄을 처리합니다."""
+        events: List[Dict[str, Any]] = []
+        if self._buffer:
+            self._handle_line(self._buffer, events)
+            self._buffer = ""
+        return events
+
+    def result(self) -> Dict[str, str]:
+        """섹션별 내용을 반환합니다. 비어 있는 섹션은 안내 문구로 채웁니다."""
+        sections = {}
+        for name, lines in self._lines.items():
+            text = '\n'.join(lines).strip()
+            sections[name] = text or f"{name} 섹션이 비어있습니다. 다시 시도해주세요."
+        return sections
+
+    def _handle_line(self, raw_line: str, events: List[Dict[str, Any]]):
+        line = raw_line.strip()
         if not line:
-            i += 1
-            continue
-        
-        # 제목 찾기 (# 으로 시작하는 첫 번째 줄)
+            # 문단 구분은 다음 내용 줄이 나올 때 한 번만 반영
+            if self._section and self._lines[self._section]:
+                self._blank_pending = True
+            return
+
         if line.startswith('# '):
-            sections['title'] = line.replace('# ', '').strip()
-            i += 1
-            continue
-        
-        # 초록 찾기
-        if line.startswith('## 초록'):
-            i += 1
-            while i < len(lines):
-                line = lines[i].strip()
-                if not line or line.startswith('## '):
-                    break
-                sections['abstract'] += line + '\n'
-                i += 1
-            continue
-        
-        # 서론 찾기
-        if line.startswith('## 1.') or line.startswith('## 서론'):
-            i += 1
-            while i < len(lines):
-                line = lines[i].strip()
-                if not line or line.startswith('## '):
-                    break
-                sections['introduction'] += line + '\n'
-                i += 1
-            continue
-        
-        # 이론적 배경 찾기
-        if line.startswith('## 2.') or line.startswith('## 이론'):
-            i += 1
-            while i < len(lines):
-                line = lines[i].strip()
-                if not line or line.startswith('## '):
-                    break
-                sections['background'] += line + '\n'
-                i += 1
-            continue
-        
-        # 연구 방법 찾기
-        if line.startswith('## 3.') or line.startswith('## 연구 방법'):
-            i += 1
-            while i < len(lines):
-                line = lines[i].strip()
-                if not line or line.startswith('## '):
-                    break
-                sections['method'] += line + '\n'
-                i += 1
-            continue
-        
-        # 연구 결과 찾기
-        if line.startswith('## 4.') or line.startswith('## 연구 결과'):
-            i += 1
-            while i < len(lines):
-                line = lines[i].strip()
-                if not line or line.startswith('## '):
-                    break
-                sections['results'] += line + '\n'
-                i += 1
-            continue
-        
-        # 결론 찾기
-        if line.startswith('## 5.') or line.startswith('## 결론'):
-            i += 1
-            while i < len(lines):
-                line = lines[i].strip()
-                if not line or line.startswith('## '):
+            # 제목은 처음 나온 것만 사용
+            if not self._lines['title']:
+                title = line[2:].strip()
+                self._lines['title'].append(title)
+                events.append({"type": "section", "section": "title", "text": title})
+            return
+
+        if line.startswith('## '):
+            self._section = None
+            self._blank_pending = False
+            for prefixes, name in SECTION_HEADINGS:
+                if line.startswith(prefixes):
+                    self._section = name
+                    events.append({"type": "section", "section": name})
                     break
-                sections['conclusion'] += line + '\n'
-                i += 1
-            continue
+            return
+
+        if self._section is None:
+            return
+        if self._blank_pending:
+            self._blank_pending = False
+            self._lines[self._section].append('')
+            events.append({"type": "line", "section": self._section, "text": ''})
+        self._lines[self._section].append(line)
+        events.append({"type": "line", "section": self._section, "text": line})
+
+
+def parse_paper_sections(content: str) -> Dict[str, str]:
+    """
+    생성된 마크다운 논문을 섹션별로 나눕니다.
+    
+    Args:
+        content: 모델이 생성한 전체 텍스트
         
-        # 참고문헌 찾기
-        if line.startswith('## 참고문헌'):
-            i += 1
-            while i < len(lines):
-                line = lines[i].strip()
-                if not line or line.startswith('## '):
-                    break
-                sections['references'] += line + '\n'
-                i += 1
-            continue
+    Returns:
+        생성된 논문의 각 섹션을 포함하는 딕셔너리
+    """
+    parser = PaperSectionParser()
+    parser.feed(content)
+    parser.close()
+    return parser.result()
+
+
+def generate_fake_paper(
+    vector_store: PaperVectorStore,
+    query: str,
+    max_tokens: int = 4096
+) -> Dict[str, str]:
+    """
+    벡터 저장소에서 유사한 논문을 검색하고, 이를 기반으로 새로운 논문을 생성합니다.
+    
+    Args:
+        vector_store: 논문 벡터 저장소
+        query: 검색 쿼리
+        max_tokens: 최대 토큰 수
         
-        i += 1
+    Returns:
+        생성된 논문의 각 섹션을 포함하는 딕셔너리
+    """
+    client = get_openai_client()
     
-    # 섹션 내용 정리
-    for section in sections:
-        sections[section] = sections[section].strip()
-        if not sections[section]:
-            sections[section] = f"{section} 섹션이 비어있습니다. 다시 시도해주세요."
+    prompt = _build_prompt(vector_store, query, max_tokens)
+
+    # GPT-4.1-nano 모델로 논문 생성
+    with span("generation", model=GENERATION_MODEL, streaming=False):
+        response = client.chat.completions.create(
+            model=GENERATION_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=max_tokens
+        )
+        record_usage(response.usage)
+    
+    # 응답 파싱
+    content = response.choices[0].message.content
+    sections = parse_paper_sections(content)
     
     # 디버깅을 위한 원본 응답 출력
     print("\n=== 원본 응답 ===")
@@ -206,3 +241,71 @@ def generate_fake_paper(
         print(content)
     
     return sections
+
+
+def stream_fake_paper(
+    vector_store: PaperVectorStore,
+    query: str,
+    max_tokens: int = 4096
+) -> Iterator[Dict[str, Any]]:
+    """
+    generate_fake_paper의 스트리밍 버전입니다. 생성되는 대로 이벤트를 내보냅니다.
+
+    이벤트 종류:
+        {"type": "token", "text": ...}: 모델이 보낸 텍스트 조각
+        {"type": "section", "section": ...}: 새 섹션의 시작 (제목은 "text"에 포함)
+        {"type": "line", "section": ..., "text": ...}: 현재 섹션에 속하는 완성된 한 줄 (빈 문자열이면 문단 구분)
+        {"type": "done", "paper": ...}: 생성 완료. generate_fake_paper와 같은 섹션 딕셔너리
+    
+    Args:
+        vector_store: 논문 벡터 저장소
+        query: 검색 쿼리
+        max_tokens: 최대 토큰 수
+    """
+    client = get_openai_client()
+    
+    prompt = _build_prompt(vector_store, query, max_tokens)
+    
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    deltas: List[str] = []
+    
+    # yield 사이에는 호출한 쪽 코드가 실행되므로 현재 스팬으로 두지 않고 직접 끝냄
+    stage = start_span("generation", model=GENERATION_MODEL, streaming=True)
+    try:
+        stream = client.chat.completions.create(
+            model=GENERATION_MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        
+        parser = PaperSectionParser()
+        
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if "first_token_ms" not in stage.attributes:
+                stage.set(first_token_ms=round(stage.elapsed_ms(), 1))
+            deltas.append(delta)
+            yield {"type": "token", "text": delta}
+            yield from parser.feed(delta)
+        
+        yield from parser.close()
+        yield {"type": "done", "paper": parser.result()}
+    except Exception as e:
+        stage.set(error=type(e).__name__)
+        raise
+    finally:
+        # 스트리밍 응답에는 usage가 없으므로 받은 만큼(중간에 닫혀도)의 토큰 수를 추정해 기록
+        try:
+            stage.record_usage(estimate_chat_usage(messages, "".join(deltas)))
+            stage.set(usage_estimated=True)
+        finally:
+            stage.end()
@@ -0,0 +1,242 @@
+# backend/paper_records.py
+import json
+import mmap
+import struct
+import zlib
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+# 바이너리 메타데이터 형식 (.papers)
+#   헤더:      magic(4) | version(u8) | flags(u8) | 필드 수(u16) | 논문 수(u32)
+#   필드 표:   필드마다 이름 길이(u16) + UTF-8 이름
+#   오프셋 표: 논문 수 + 1개의 u64 (각 논문 레코드의 시작 위치, 마지막은 파일 끝)
+#   레코드:    필드 표 순서대로 태그(u8) + 길이(u32) + 값. 태그가 없음(0)이면 길이와 값 생략
+# 모든 정수는 리틀 엔디언입니다.
+RECORDS_MAGIC = b"NLPR"
+RECORDS_VERSION = 1
+COMPRESSED_FIELDS = ("abstract",)
+# 이보다 짧은 값은 압축해도 이득이 없으므로 그대로 저장
+MIN_COMPRESS_BYTES = 128
+
+_HEADER = struct.Struct("<4sBBHI")
+_FIELD_NAME_LENGTH = struct.Struct("<H")
+_VALUE_LENGTH = struct.Struct("<I")
+
+TAG_ABSENT = 0
+TAG_TEXT = 1
+TAG_ZLIB_TEXT = 2
+TAG_JSON = 3
+
+
+def _encode_value(value: Any, compress: bool):
+    """값을 (태그, 바이트)로 바꿉니다. 문자열이 아닌 값은 JSON으로 저장합니다."""
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+        if compress and len(data) >= MIN_COMPRESS_BYTES:
+            compressed = zlib.compress(data, 6)
+            if len(compressed) < len(data):
+                return TAG_ZLIB_TEXT, compressed
+        return TAG_TEXT, data
+    return TAG_JSON, json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _decode_value(tag: int, data) -> Any:
+    if tag == TAG_TEXT:
+        return str(data, "utf-8")
+    if tag == TAG_ZLIB_TEXT:
+        return zlib.decompress(data).decode("utf-8")
+    if tag == TAG_JSON:
+        return json.loads(bytes(data))
+    raise ValueError(f"알 수 없는 값 태그입니다: {tag}")
+
+
+def write_binary_records(path: str, papers: Sequence, compress_fields: Iterable[str] = COMPRESSED_FIELDS):
+    """
+    논문 메타데이터를 바이너리 형식으로 씁니다.
+
+    Args:
+        path: 저장할 파일 경로
+        papers: 논문 딕셔너리 목록
+        compress_fields: zlib으로 압축할 필드 (압축해서 작아질 때만 압축)
+    """
+    papers = list(papers)
+    compress_fields = set(compress_fields)
+    fields: Dict[str, int] = {}
+    for paper in papers:
+        for name in paper:
+            fields.setdefault(name, len(fields))
+
+    header = bytearray(_HEADER.pack(RECORDS_MAGIC, RECORDS_VERSION, 0, len(fields), len(papers)))
+    for name in fields:
+        encoded = name.encode("utf-8")
+        header += _FIELD_NAME_LENGTH.pack(len(encoded)) + encoded
+
+    records = []
+    for paper in papers:
+        record = bytearray()
+        for name in fields:
+            if name not in paper:
+                record.append(TAG_ABSENT)
+                continue
+            tag, data = _encode_value(paper[name], name in compress_fields)
+            record.append(tag)
+            record += _VALUE_LENGTH.pack(len(data)) + data
+        records.append(record)
+
+    # 오프셋은 헤더, 필드 표, 오프셋 표 다음부터 시작
+    position = len(header) + 8 * (len(papers) + 1)
+    offsets = [position]
+    for record in records:
+        position += len(record)
+        offsets.append(position)
+
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(np.asarray(offsets, dtype="<u8").tobytes())
+        for record in records:
+            f.write(record)
+
+
+def write_json_records(json_path: str, offsets_path: str, papers: Sequence):
+    """
+    논문 메타데이터를 한 줄에 논문 하나인 JSON 배열로 쓰고, 줄마다 시작 위치를 오프셋 파일에 기록합니다.
+    """
+    offsets = []
+    with open(json_path, "wb") as f:
+        f.write(b"[\n")
+        for i, paper in enumerate(papers):
+            offsets.append(f.tell())
+            f.write(json.dumps(paper, ensure_ascii=False).encode("utf-8"))
+            f.write(b",\n" if i < len(papers) - 1 else b"\n")
+        offsets.append(f.tell())
+        f.write(b"]\n")
+    np.asarray(offsets, dtype="<i8").tofile(offsets_path)
+
+
+class BinaryPaperRecords(Sequence):
+    """
+    바이너리 형식(.papers)의 논문 메타데이터를 행 번호로 읽는 읽기 전용 시퀀스입니다.
+
+    fields를 지정하면 나머지 필드는 길이만 보고 건너뛰므로, 압축된 초록 같은 큰 값을
+    읽지도 풀지도 않습니다.
+    """
+
+    def __init__(self, data, fields: Optional[Iterable[str]] = None):
+        """
+        Args:
+            data: 파일 내용 (bytes 또는 메모리 맵)
+            fields: 읽을 필드 이름. None이면 모든 필드
+        """
+        magic, version, _flags, n_fields, n_records = _HEADER.unpack_from(data, 0)
+        if magic != RECORDS_MAGIC:
+            raise ValueError("논문 메타데이터 파일 형식이 아닙니다.")
+        if version > RECORDS_VERSION:
+            raise ValueError(f"지원하지 않는 메타데이터 버전입니다: {version}")
+        position = _HEADER.size
+        names = []
+        for _ in range(n_fields):
+            (length,) = _FIELD_NAME_LENGTH.unpack_from(data, position)
+            position += _FIELD_NAME_LENGTH.size
+            names.append(str(data[position:position + length], "utf-8"))
+            position += length
+        self._data = data
+        self._names = names
+        self._wanted = None if fields is None else set(fields)
+        self._offsets = np.frombuffer(data, dtype="<u8", count=n_records + 1, offset=position)
+
+    @classmethod
+    def open(cls, path: str, use_mmap: bool = True, fields: Optional[Iterable[str]] = None) -> "BinaryPaperRecords":
+        """파일을 엽니다. use_mmap이면 메모리 맵으로, 아니면 파일 전체를 읽어서 엽니다."""
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap else f.read()
+        return cls(data, fields)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        data = self._data
+        position = int(self._offsets[i])
+        paper = {}
+        for name in self._names:
+            tag = data[position]
+            position += 1
+            if tag == TAG_ABSENT:
+                continue
+            (length,) = _VALUE_LENGTH.unpack_from(data, position)
+            position += _VALUE_LENGTH.size
+            if self._wanted is None or name in self._wanted:
+                paper[name] = _decode_value(tag, memoryview(data)[position:position + length])
+            position += length
+        return paper
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class JsonPaperRecords(Sequence):
+    """
+    저장된 논문 메타데이터를 행 번호로 필요할 때만 읽는 읽기 전용 시퀀스입니다.
+
+    .json 파일(한 줄에 논문 하나)을 메모리 맵으로 열고, .offsets 파일의 행별 시작 위치로
+    해당 논문만 잘라 파싱합니다. 같은 파일을 여는 프로세스들은 운영체제의 페이지 캐시를 공유합니다.
+    """
+
+    def __init__(self, data: mmap.mmap, offsets: np.ndarray, fields: Optional[Iterable[str]] = None):
+        self._data = data
+        self._offsets = offsets
+        self._wanted = None if fields is None else set(fields)
+
+    @classmethod
+    def open(cls, json_path: str, offsets_path: str, fields: Optional[Iterable[str]] = None) -> Optional["JsonPaperRecords"]:
+        """
+        JSON 메타데이터를 엽니다.
+
+        Returns:
+            JsonPaperRecords. 오프셋 파일이 없거나 .json과 맞지 않으면(예전 형식) None
+        """
+        try:
+            with open(json_path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            offsets = np.memmap(offsets_path, dtype="<i8", mode="r")
+        except (FileNotFoundError, ValueError):
+            # ValueError: 빈 파일은 메모리 맵으로 열 수 없음
+            return None
+        # 마지막 오프셋은 배열을 닫는 ']' 위치이므로 파일 크기와 맞아야 함
+        if not len(offsets) or data[:1] != b"[" or offsets[-1] + len(b"]\n") != len(data):
+            data.close()
+            return None
+        return cls(data, offsets, fields)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        raw = self._data[self._offsets[i]:self._offsets[i + 1]]
+        paper = json.loads(raw.rstrip(b",\n"))
+        if self._wanted is not None:
+            paper = {name: value for name, value in paper.items() if name in self._wanted}
+        return paper
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def select_fields(papers: Iterable[Dict[str, Any]], fields: Optional[Iterable[str]]) -> List[Dict[str, Any]]:
+    """논문 목록에서 지정한 필드만 남깁니다. fields가 None이면 그대로 반환합니다."""
+    if fields is None:
+        return list(papers)
+    wanted = set(fields)
+    return [{name: value for name, value in paper.items() if name in wanted} for paper in papers]
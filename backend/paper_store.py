@@ -0,0 +1,338 @@
+# backend/paper_store.py
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.resources import shared_resource
+from backend.tracing import span
+
+PAPERS_DB_PATH = "generated_papers.db"
+LEGACY_PAPERS_JSON_PATH = "generated_papers.json"
+
+# 논문 본문 필드 (저장 순서)
+PAPER_FIELDS = ["title", "abstract", "introduction", "background", "method", "results", "conclusion", "references"]
+META_FIELDS = ["paper_id", "search_query", "generated_at", "reaction", "reaction_gif"]
+COLUMNS = META_FIELDS + PAPER_FIELDS
+# references는 SQL 예약어이므로 따옴표로 감쌈
+_QUOTED_COLUMNS = ", ".join(f'"{column}"' for column in COLUMNS)
+# 목록 화면에 필요한 요약 필드
+SUMMARY_COLUMNS = ["paper_id", "title", "search_query", "generated_at"]
+
+# 전문 검색 색인 컬럼과 bm25 가중치 (제목 > 초록 > 본문)
+FTS_BODY_FIELDS = ["introduction", "background", "method", "results", "conclusion", "references"]
+FTS_WEIGHTS = (5.0, 2.0, 1.0)
+SEARCH_LIMIT = 50
+
+_WORD_PATTERN = re.compile(r"\w+")
+# 한글/한자/가나처럼 띄어쓰기 단위와 형태소가 어긋나는 문자
+_CJK_PATTERN = re.compile(r"[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u9fff\uac00-\ud7af]")
+# 검색어 끝에 붙었을 수 있는 한 글자 조사. 뗀 단어로도 찾음 ("고양이가" -> "고양이")
+QUERY_PARTICLES = ("은", "는", "이", "가", "을", "를", "의", "에", "도", "와", "과", "로")
+
+
+def ngram_tokens(text: str) -> List[str]:
+    """
+    검색 색인용 토큰을 만듭니다.
+
+    한국어는 조사와 어미가 붙어 띄어쓰기 단위로는 찾기 어려우므로 한글이 들어간 단어는
+    문자 바이그램으로 나눕니다 ("고양이는" -> "고양", "양이", "이는").
+    그 밖의 단어는 소문자로 바꿔 통째로 사용합니다.
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall((text or "").lower()):
+        if len(word) > 1 and _CJK_PATTERN.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def _ngram_text(text: str) -> str:
+    return " ".join(ngram_tokens(text))
+
+
+def _word_terms(word: str) -> List[str]:
+    """검색어 한 단어를 MATCH 항 목록으로 바꿉니다."""
+    tokens = ngram_tokens(word)
+    if len(tokens) == 1 and len(word) == 1 and _CJK_PATTERN.search(word):
+        # 한 글자 검색어는 그 글자로 시작하는 바이그램과 매칭
+        return [f'"{word}"*']
+    return [f'"{token}"' for token in tokens]
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    검색어를 FTS5 MATCH 식으로 바꿉니다. 모든 단어가 들어간 논문만 찾습니다.
+
+    조사로 끝날 수 있는 단어("고양이가")는 원래 단어와 조사를 뗀 단어 중 하나만 있어도 찾습니다.
+    "고양이"처럼 명사 끝 글자가 조사와 같은 경우에도 원래 단어로 찾을 수 있고,
+    관련도 순으로 정렬하므로 원래 단어가 들어간 논문이 앞에 옵니다.
+
+    Returns:
+        MATCH 식. 검색할 토큰이 없으면 None
+    """
+    groups = []
+    for word in _WORD_PATTERN.findall((query or "").lower()):
+        variants = [word]
+        if len(word) >= 3 and word.endswith(QUERY_PARTICLES):
+            variants.append(word[:-1])
+        alternatives = [" AND ".join(dict.fromkeys(_word_terms(variant))) for variant in variants]
+        if len(alternatives) == 1:
+            groups.append(alternatives[0])
+        else:
+            groups.append("(" + " OR ".join(f"({alternative})" for alternative in alternatives) + ")")
+    return " AND ".join(dict.fromkeys(groups)) or None
+
+
+class PaperStore:
+    """
+    생성된 논문을 저장하는 SQLite 저장소입니다.
+
+    WAL 모드로 여러 Streamlit 세션이 동시에 읽고 쓸 수 있으며, 저장은 한 건씩 트랜잭션으로
+    처리되어 JSON 파일 전체를 다시 쓰는 방식에서 생기던 쓰기 유실이 없습니다.
+    """
+
+    def __init__(self, path: str = PAPERS_DB_PATH, legacy_json_path: Optional[str] = LEGACY_PAPERS_JSON_PATH):
+        """
+        Args:
+            path: SQLite 파일 경로
+            legacy_json_path: 처음 한 번 가져올 예전 JSON 저장 파일 (없으면 생략)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        if legacy_json_path:
+            self.migrate_from_json(legacy_json_path)
+
+    def _create_schema(self):
+        with self._lock:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS papers (
+                    paper_id TEXT PRIMARY KEY,
+                    search_query TEXT NOT NULL DEFAULT '',
+                    generated_at TEXT NOT NULL,
+                    reaction TEXT,
+                    reaction_gif TEXT,
+                    title TEXT NOT NULL DEFAULT '',
+                    abstract TEXT NOT NULL DEFAULT '',
+                    introduction TEXT NOT NULL DEFAULT '',
+                    background TEXT NOT NULL DEFAULT '',
+                    method TEXT NOT NULL DEFAULT '',
+                    results TEXT NOT NULL DEFAULT '',
+                    conclusion TEXT NOT NULL DEFAULT '',
+                    "references" TEXT NOT NULL DEFAULT ''
+                );
+                CREATE INDEX IF NOT EXISTS idx_papers_generated_at_paper_id ON papers(generated_at, paper_id);
+                CREATE INDEX IF NOT EXISTS idx_papers_search_query ON papers(search_query);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    title, abstract, body, tokenize = 'unicode61'
+                );
+                """
+            )
+            # 색인이 생기기 전에 저장된 논문을 한 번에 색인
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._index_missing()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _index_rows(self, rows):
+        """(rowid, 논문) 목록을 전문 검색 색인에 넣습니다."""
+        self._conn.executemany(
+            "INSERT INTO papers_fts (rowid, title, abstract, body) VALUES (?, ?, ?, ?)",
+            [(
+                rowid,
+                _ngram_text(paper["title"]),
+                _ngram_text(paper["abstract"]),
+                _ngram_text(" ".join(paper[field] or "" for field in FTS_BODY_FIELDS)),
+            ) for rowid, paper in rows],
+        )
+
+    def _index_missing(self):
+        """색인에 없는 논문을 색인합니다. 호출하는 쪽에서 트랜잭션을 엽니다."""
+        fields = ", ".join(f'"{field}"' for field in ["title", "abstract"] + FTS_BODY_FIELDS)
+        rows = self._conn.execute(
+            f"SELECT rowid, {fields} FROM papers WHERE rowid NOT IN (SELECT rowid FROM papers_fts)"
+        ).fetchall()
+        self._index_rows([(row["rowid"], row) for row in rows])
+
+    def _insert(self, papers: List[Dict[str, Any]]):
+        """논문들을 INSERT 하고 검색 색인에도 추가합니다. 호출하는 쪽에서 트랜잭션을 엽니다."""
+        placeholders = ", ".join("?" * len(COLUMNS))
+        indexed = []
+        for paper in papers:
+            values = {
+                column: paper.get(column) if column in ("reaction", "reaction_gif") else (paper.get(column) or "")
+                for column in COLUMNS
+            }
+            cursor = self._conn.execute(
+                f"INSERT OR IGNORE INTO papers ({_QUOTED_COLUMNS}) VALUES ({placeholders})",
+                [values[column] for column in COLUMNS],
+            )
+            # 이미 있던 논문(IGNORE)은 색인도 이미 있음
+            if cursor.rowcount:
+                indexed.append((cursor.lastrowid, values))
+        self._index_rows(indexed)
+
+    def add_paper(self, paper_data: Dict[str, Any], search_query: str, reaction: Optional[str] = None, reaction_gif: Optional[str] = None) -> str:
+        """
+        논문 한 편을 저장합니다.
+
+        Args:
+            paper_data: 섹션별 논문 내용 (생성 시각, 검색어, id가 추가됨)
+            search_query: 논문을 생성한 검색어
+            reaction: AI 리액션
+            reaction_gif: 리액션 GIF URL
+
+        Returns:
+            저장된 논문의 id
+        """
+        paper_data["generated_at"] = datetime.now().isoformat()
+        paper_data["search_query"] = search_query
+        paper_data["paper_id"] = str(uuid.uuid4())
+        paper_data["reaction"] = reaction
+        paper_data["reaction_gif"] = reaction_gif
+        with span("archive_write") as stage, self._lock:
+            stage.add("bytes", sum(len(str(paper_data.get(field) or "").encode("utf-8")) for field in PAPER_FIELDS))
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._insert([paper_data])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return paper_data["paper_id"]
+
+    def update_reaction(self, paper_id: str, reaction: Optional[str], reaction_gif: Optional[str]):
+        """논문의 리액션을 바꿉니다."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE papers SET reaction = ?, reaction_gif = ? WHERE paper_id = ?",
+                (reaction, reaction_gif, paper_id),
+            )
+
+    def get_paper(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """id로 논문 한 편을 가져옵니다."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_QUOTED_COLUMNS} FROM papers WHERE paper_id = ?", (paper_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_paper_page(self, limit: int, before: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        최신순 목록의 한 페이지를 키셋(keyset) 방식으로 가져옵니다.
+
+        OFFSET 없이 (generated_at, paper_id) 인덱스를 따라가므로 보관함이 커져도
+        페이지를 읽는 비용이 일정합니다. 본문은 포함하지 않습니다.
+
+        Args:
+            limit: 가져올 최대 논문 수
+            before: 이전 페이지 마지막 논문의 (generated_at, paper_id). None이면 첫 페이지
+
+        Returns:
+            paper_id, title, search_query, generated_at만 담은 요약 목록
+        """
+        columns = ", ".join(SUMMARY_COLUMNS)
+        with self._lock:
+            if before is None:
+                rows = self._conn.execute(
+                    f"SELECT {columns} FROM papers ORDER BY generated_at DESC, paper_id DESC LIMIT ?",
+                    (limit,),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT {columns} FROM papers WHERE (generated_at, paper_id) < (?, ?) "
+                    "ORDER BY generated_at DESC, paper_id DESC LIMIT ?",
+                    (before[0], before[1], limit),
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search_papers(self, query: str, limit: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        제목, 초록, 본문에서 검색어를 찾아 관련도(bm25) 순으로 반환합니다.
+
+        Args:
+            query: 검색어 (모든 단어가 들어간 논문만 찾음)
+            limit: 가져올 최대 논문 수
+
+        Returns:
+            list_paper_page와 같은 요약 목록
+        """
+        match = build_match_query(query)
+        if match is None:
+            return []
+        columns = ", ".join(f"p.{column}" for column in SUMMARY_COLUMNS)
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid "
+                f"WHERE papers_fts MATCH ? ORDER BY bm25(papers_fts, {weights}) LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        예전 JSON 저장 파일의 논문을 한 번만 가져옵니다. 원본 파일은 그대로 둡니다.
+
+        Returns:
+            가져온 논문 수 (이미 가져온 경우 0)
+        """
+        marker = f"migrated:{os.path.abspath(json_path)}"
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone():
+                return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                papers = json.load(f)
+        except FileNotFoundError:
+            papers = []
+        except json.JSONDecodeError as e:
+            print(f"❌ 예전 논문 저장 파일을 읽지 못했습니다: {e}")
+            return 0
+
+        # id나 생성 시각이 없는 항목도 잃지 않도록 채워 넣음
+        for paper in papers:
+            paper.setdefault("paper_id", str(uuid.uuid4()))
+            paper.setdefault("generated_at", datetime.now().isoformat())
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 다른 프로세스가 먼저 가져갔는지 트랜잭션 안에서 다시 확인
+                if self._conn.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone():
+                    self._conn.execute("ROLLBACK")
+                    return 0
+                self._insert(papers)
+                self._conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (marker, datetime.now().isoformat()))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(papers)
+
+
+@shared_resource
+def get_paper_store(path: str = PAPERS_DB_PATH, legacy_json_path: Optional[str] = LEGACY_PAPERS_JSON_PATH) -> PaperStore:
+    """경로별 논문 저장소를 반환합니다. 같은 경로는 같은 연결을 씁니다."""
+    return PaperStore(path, legacy_json_path)
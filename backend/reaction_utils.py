@@ -1,15 +1,51 @@
-from openai import OpenAI
+from backend.resources import get_openai_client, shared_resource
 import requests
 import random
 import os
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
 from dotenv import load_dotenv
+from backend.disk_cache import CACHE_DIR
+from backend.tracing import bind_context, record_usage, span
 
 load_dotenv()
 GIPHY_API_KEY = os.getenv("GIPHY_API_KEY")
 
+# 논문 렌더링과 겹쳐서 리액션을 만들 백그라운드 작업자 수
+REACTION_WORKERS = 4
+
+GIPHY_SEARCH_URL = "https://api.giphy.com/v1/gifs/search"
+GIPHY_TIMEOUT = 10
+
+# 한글 리액션을 영어 감정/상황 키워드로 매핑
+EMOTION_KEYWORDS = {
+    "뭘": "confused",
+    "기절": "faint",
+    "천재": "genius",
+    "놀랍": "surprised",
+    "황당": "shocked",
+    "웃": "laugh",
+    "대박": "amazing",
+    "미쳤": "crazy",
+    "헐": "omg",
+    "어이": "speechless"
+}
+DEFAULT_EMOTION = "confused"
+
+# GIF 풀 설정: 키워드당 보관할 GIF 수, 갱신 주기, 갱신 필요 여부를 확인하는 간격(초)
+GIF_POOL_PATH = os.path.join(CACHE_DIR, "gif_pool.json")
+GIF_POOL_SIZE = 25
+GIF_POOL_REFRESH_SECONDS = 6 * 3600
+GIF_POOL_CHECK_INTERVAL = 10 * 60
+
+_reaction_executor = ThreadPoolExecutor(max_workers=REACTION_WORKERS, thread_name_prefix="reaction")
+
 def generate_reaction(paper_title, paper_abstract):
     """논문에 대한 재미있는 리액션을 생성합니다."""
-    client = OpenAI()
+    client = get_openai_client()
     
     prompt = f"""다음 논문의 제목과 초록을 읽고, 이에 대한 재미있고 위트있는 리액션을 한 문장으로 만들어주세요.
     재미있거나, 황당하거나, 의아하거나, 놀라운 반응이면 좋습니다.
@@ -26,62 +62,147 @@ def generate_reaction(paper_title, paper_abstract):
     위와 같은 스타일로, 논문을 읽은 후의 재미있는 리액션을 한 문장으로 만들어주세요.
     단, 반드시 한국어로 작성해주세요."""
     
-    response = client.chat.completions.create(
-        model="gpt-4.1-nano",
-        messages=[
-            {"role": "system", "content": "You are a witty academic reviewer who loves to make funny reactions to papers."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.8,
-        max_tokens=100
-    )
+    with span("reaction", model="gpt-4.1-nano"):
+        response = client.chat.completions.create(
+            model="gpt-4.1-nano",
+            messages=[
+                {"role": "system", "content": "You are a witty academic reviewer who loves to make funny reactions to papers."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.8,
+            max_tokens=100
+        )
+        record_usage(response.usage)
     
     return response.choices[0].message.content.strip().strip('"')
 
+class GifPool:
+    """
+    감정 키워드별 GIF URL 풀입니다.
+
+    GIPHY 검색 결과를 미리 받아 메모리와 디스크에 보관하고, 주기적으로 새로 고칩니다.
+    GIF 선택은 네트워크 없이 풀에서 무작위로 고르며, GIPHY가 응답하지 않으면
+    오래된 데이터를 그대로 사용합니다.
+    """
+
+    def __init__(self, path: str = GIF_POOL_PATH, refresh_seconds: float = GIF_POOL_REFRESH_SECONDS):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._pool: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            snapshot = json.dumps(self._pool, ensure_ascii=False)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.path)
+
+    def pick(self, keyword: str) -> Optional[str]:
+        """풀에서 GIF URL 하나를 무작위로 고릅니다. 풀이 비어 있으면 None을 반환합니다."""
+        with self._lock:
+            urls = self._pool.get(keyword, {}).get("urls")
+        return random.choice(urls) if urls else None
+
+    def refresh(self, keyword: str) -> bool:
+        """GIPHY에서 키워드의 GIF 목록을 새로 받아옵니다. 실패하면 기존 풀을 유지합니다."""
+        try:
+            response = requests.get(GIPHY_SEARCH_URL, params={
+                "api_key": GIPHY_API_KEY,
+                "q": keyword,
+                "limit": GIF_POOL_SIZE,
+                "rating": "g"
+            }, timeout=GIPHY_TIMEOUT)
+            response.raise_for_status()
+            urls = [gif["images"]["original"]["url"] for gif in response.json()["data"]]
+        except Exception as e:
+            print(f"GIPHY API 호출 중 오류 발생: {e}")
+            return False
+        if not urls:
+            return False
+        with self._lock:
+            self._pool[keyword] = {"urls": urls, "fetched_at": time.time()}
+        self._save()
+        return True
+
+    def refresh_stale(self):
+        """새로 고칠 때가 된 키워드를 모두 갱신합니다."""
+        now = time.time()
+        for keyword in set(EMOTION_KEYWORDS.values()) | {DEFAULT_EMOTION}:
+            with self._lock:
+                fetched_at = self._pool.get(keyword, {}).get("fetched_at", 0)
+            if now - fetched_at >= self.refresh_seconds:
+                self.refresh(keyword)
+
+    def start_background_refresh(self):
+        """주기적으로 풀을 새로 고치는 데몬 스레드를 시작합니다 (한 번만 시작됨)."""
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="gif-pool-refresh", daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.refresh_stale()
+            except Exception as e:
+                print(f"GIF 풀 갱신 중 오류 발생: {e}")
+            time.sleep(GIF_POOL_CHECK_INTERVAL)
+
+
+@shared_resource
+def get_gif_pool() -> GifPool:
+    """디스크에 저장해 둔 GIF 풀을 읽고 백그라운드 갱신을 시작합니다."""
+    pool = GifPool()
+    pool.start_background_refresh()
+    return pool
+
+
 def get_reaction_gif(reaction_text):
-    """리액션 텍스트를 기반으로 적절한 GIF를 검색합니다."""
-    try:
-        # 한글 리액션을 영어 감정/상황 키워드로 매핑
-        emotion_keywords = {
-            "뭘": "confused",
-            "기절": "faint",
-            "천재": "genius",
-            "놀랍": "surprised",
-            "황당": "shocked",
-            "웃": "laugh",
-            "대박": "amazing",
-            "미쳤": "crazy",
-            "헐": "omg",
-            "어이": "speechless"
-        }
-        
-        # 리액션 텍스트에서 키워드 찾기
-        search_query = "confused"  # 기본값
-        for kr_word, en_word in emotion_keywords.items():
-            if kr_word in reaction_text:
-                search_query = en_word
-                break
-        
-        # GIPHY API 호출
-        url = f"https://api.giphy.com/v1/gifs/search"
-        params = {
-            "api_key": GIPHY_API_KEY,
-            "q": search_query,
-            "limit": 10,
-            "rating": "g"
-        }
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
-        if data["data"]:
-            # 랜덤하게 하나의 GIF 선택
-            gif = random.choice(data["data"])
-            return gif["images"]["original"]["url"]
-            
-    except Exception as e:
-        print(f"GIPHY API 호출 중 오류 발생: {e}")
-        return None
+    """리액션 텍스트를 기반으로 적절한 GIF를 고릅니다. 미리 받아 둔 풀에서 고르므로 보통 네트워크 요청이 없습니다."""
+    # 리액션 텍스트에서 키워드 찾기
+    search_query = DEFAULT_EMOTION
+    for kr_word, en_word in EMOTION_KEYWORDS.items():
+        if kr_word in reaction_text:
+            search_query = en_word
+            break
     
-    return None 
\ No newline at end of file
+    with span("gif", emotion=search_query, source="pool") as stage:
+        pool = get_gif_pool()
+        gif_url = pool.pick(search_query)
+        if gif_url is None:
+            stage.set(source="giphy")
+            if pool.refresh(search_query):
+                # 처음 실행이라 풀이 비어 있는 경우에만 직접 받아옴
+                gif_url = pool.pick(search_query)
+        stage.set(found=gif_url is not None)
+    return gif_url
+
+
+def generate_reaction_with_gif(paper_title, paper_abstract) -> Tuple[str, Optional[str]]:
+    """리액션을 생성하고 그에 맞는 GIF URL을 함께 반환합니다."""
+    reaction = generate_reaction(paper_title, paper_abstract)
+    return reaction, get_reaction_gif(reaction)
+
+
+def submit_reaction(paper_title, paper_abstract) -> "Future[Tuple[str, Optional[str]]]":
+    """
+    리액션 생성과 GIF 검색을 백그라운드에서 시작합니다.
+
+    호출한 쪽은 논문을 그리는 동안 기다리지 않고, 나중에 future.result(timeout=...)로
+    결과를 받거나 시간 초과 시 대체 화면을 보여줄 수 있습니다.
+    """
+    return _reaction_executor.submit(bind_context(generate_reaction_with_gif), paper_title, paper_abstract)
@@ -0,0 +1,50 @@
+# backend/resources.py
+import inspect
+import threading
+from functools import lru_cache, wraps
+from typing import Callable, TypeVar
+
+import tiktoken
+from openai import OpenAI
+
+T = TypeVar("T")
+
+
+def shared_resource(factory: Callable[..., T]) -> Callable[..., T]:
+    """
+    인자별로 한 번만 만들어 프로세스 전체에서 재사용하는 getter를 만듭니다.
+
+    lru_cache와 같지만 여러 스레드가 처음에 동시에 호출해도 한 번만 만들므로,
+    백그라운드 스레드를 시작하거나 파일을 로드하는 자원에도 쓸 수 있습니다.
+    기본값을 생략한 호출과 명시한 호출은 같은 자원을 돌려받습니다.
+    """
+    cached = lru_cache(maxsize=None)(factory)
+    signature = inspect.signature(factory)
+    lock = threading.Lock()
+
+    @wraps(factory)
+    def getter(*args, **kwargs) -> T:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        with lock:
+            return cached(*bound.args, **bound.kwargs)
+
+    getter.cache_clear = cached.cache_clear
+    return getter
+
+
+@shared_resource
+def get_openai_client() -> OpenAI:
+    """
+    OpenAI 클라이언트를 반환합니다.
+
+    클라이언트는 내부 HTTP 연결 풀을 가지고 있고 스레드 간에 공유해도 안전하므로,
+    호출마다 새로 만들지 않고 한 번 만든 것을 재사용합니다.
+    """
+    return OpenAI()
+
+
+@shared_resource
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """모델에 맞는 tiktoken 인코딩을 한 번만 로드하여 반환합니다."""
+    return tiktoken.encoding_for_model(model)
@@ -0,0 +1,103 @@
+# backend/sentences.py
+import re
+from itertools import accumulate
+from typing import List, Sequence, Tuple
+
+Span = Tuple[int, int]
+
+# 문장 끝 후보: 마침표류와 닫는 따옴표/괄호 뒤에 공백이 오거나, 공백 없이 한글/대문자 문장이 이어지는 경우
+_BOUNDARY_PATTERN = re.compile(
+    r"[.!?。？！…]+[\"'”’)\]]*(?:\s+|(?=[가-힣A-Z]))"
+    r"|\x00"
+)
+# 마침표 바로 앞의 영문 단어 (약어 판별용)
+_LAST_WORD_PATTERN = re.compile(r"[A-Za-z]+$")
+# 문장 맨 앞의 목록 번호 ("1. 서론")
+_LIST_NUMBER_PATTERN = re.compile(r"\s*(?:\d{1,2}|[IVX]{1,4}|[가-하])$")
+# 배치를 한 문자열로 이을 때 쓰는 구분자 (초록에 나오지 않는 문자)
+DOCUMENT_SEPARATOR = "\x00"
+
+# 마침표가 붙어도 문장이 끝나지 않는 약어
+ABBREVIATIONS = {
+    "al", "cf", "dr", "eds", "eg", "etc", "fig", "figs", "ie", "jr", "mr", "mrs", "ms", "no", "nos",
+    "p", "pp", "prof", "sr", "st", "tab", "vol", "vols", "vs",
+}
+
+
+def _is_boundary(text: str, sentence_start: int, match: re.Match) -> bool:
+    """문장 끝 후보가 실제 문장 끝인지 판별합니다."""
+    punctuation_end = match.start()
+    while punctuation_end < match.end() and text[punctuation_end] in ".!?。？！…":
+        punctuation_end += 1
+    # 마침표 하나만 있을 때만 약어, 이니셜, 목록 번호일 수 있음
+    if text[match.start():punctuation_end] != ".":
+        return True
+    word = _LAST_WORD_PATTERN.search(text, max(sentence_start, match.start() - 8), match.start())
+    if word and (word.group().lower() in ABBREVIATIONS or (len(word.group()) == 1 and word.group().isupper())):
+        return False
+    if _LIST_NUMBER_PATTERN.fullmatch(text, sentence_start, match.start()):
+        return False
+    return True
+
+
+def _strip_span(text: str, start: int, end: int) -> Span:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def segment_sentences_batch(texts: Sequence[str]) -> List[List[Span]]:
+    """
+    여러 글을 한 번에 문장 단위로 나눕니다.
+
+    글들을 구분자로 이어 정규식을 한 번만 훑으며, 소수점(3.14), 영문 약어(et al., Fig.),
+    이니셜(J. Kim), 목록 번호(1. 서론)에서는 나누지 않습니다.
+    한국어 문장처럼 마침표 뒤에 공백 없이 다음 문장이 붙어 있어도 나눕니다.
+
+    Returns:
+        글마다 문장의 (시작, 끝) 문자 위치 목록. 위치는 각 글 기준이며 앞뒤 공백은 제외합니다.
+    """
+    joined = DOCUMENT_SEPARATOR.join(texts)
+    document_starts = [0] + list(accumulate(len(text) + len(DOCUMENT_SEPARATOR) for text in texts))
+    results: List[List[Span]] = [[] for _ in texts]
+    if not texts:
+        return results
+
+    document = 0
+    sentence_start = 0
+
+    def emit(end: int):
+        start, end = _strip_span(joined, sentence_start, end)
+        if start < end:
+            base = document_starts[document]
+            results[document].append((start - base, end - base))
+
+    for match in _BOUNDARY_PATTERN.finditer(joined):
+        if match.group() == DOCUMENT_SEPARATOR:
+            emit(match.start())
+            document += 1
+            sentence_start = match.end()
+        elif _is_boundary(joined, sentence_start, match):
+            emit(match.end())
+            sentence_start = match.end()
+    emit(len(joined))
+    return results
+
+
+def segment_sentences(text: str) -> List[Span]:
+    """글 하나를 문장 단위로 나눕니다. segment_sentences_batch를 참고하세요."""
+    return segment_sentences_batch([text])[0]
+
+
+def select_key_spans(spans: Sequence[Span], head: int, tail: int) -> List[Span]:
+    """처음 head개와 마지막 tail개 문장을 고릅니다. 문장이 그보다 적으면 모두 고릅니다."""
+    if len(spans) <= head + tail:
+        return list(spans)
+    return list(spans[:head]) + list(spans[len(spans) - tail:])
+
+
+def join_spans(text: str, spans: Sequence[Span]) -> str:
+    """고른 문장들을 공백으로 이어 붙입니다."""
+    return " ".join(text[start:end] for start, end in spans)
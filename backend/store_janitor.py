@@ -0,0 +1,159 @@
+# backend/store_janitor.py
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from backend.resources import shared_resource
+from backend.vector_store import GLOBAL_STORE_PATH, VECTORSTORE_DIR
+
+# 정리 주기, 저장소 최대 보관 기간, vectorstore 디렉터리 전체 용량 상한
+STORE_JANITOR_INTERVAL = float(os.getenv("VECTORSTORE_JANITOR_INTERVAL", 10 * 60))
+STORE_MAX_AGE_SECONDS = float(os.getenv("VECTORSTORE_MAX_AGE_SECONDS", 24 * 60 * 60))
+STORE_MAX_BYTES = int(os.getenv("VECTORSTORE_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+
+
+def _store_key(path: str) -> str:
+    return os.path.abspath(path)
+
+
+class StoreJanitor:
+    """
+    벡터 저장소 디렉터리를 백그라운드에서 정리합니다.
+
+    저장소 하나는 같은 이름에 확장자만 다른 파일들(.index, .json, 임시 파일 등)로 이루어지며,
+    오래된 저장소를 지운 뒤에도 전체 용량이 상한을 넘으면 가장 오래 수정되지 않은 저장소부터 지웁니다.
+    고정(pin)된 저장소는 지우지 않습니다. 세션이 쓰는 저장소는 전역 인덱스 하나뿐이므로 그것만 고정합니다.
+    """
+
+    def __init__(
+        self,
+        directory: str = VECTORSTORE_DIR,
+        max_age_seconds: Optional[float] = STORE_MAX_AGE_SECONDS,
+        max_bytes: Optional[int] = STORE_MAX_BYTES,
+        interval_seconds: float = STORE_JANITOR_INTERVAL
+    ):
+        """
+        Args:
+            directory: 벡터 저장소 디렉터리
+            max_age_seconds: 마지막 수정 후 이 시간이 지난 저장소를 삭제 (None이면 나이로 지우지 않음)
+            max_bytes: 디렉터리 전체 용량 상한 (None이면 용량으로 지우지 않음)
+            interval_seconds: 백그라운드 정리 주기(초)
+        """
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._pinned: Set[str] = set()
+        self._worker: Optional[threading.Thread] = None
+
+    def pin(self, path: str):
+        """저장소를 항상 보존하도록 고정합니다 (확장자를 뺀 경로)."""
+        with self._lock:
+            self._pinned.add(_store_key(path))
+
+    def _is_protected(self, key: str) -> bool:
+        return key in self._pinned
+
+    def _scan(self) -> Dict[str, Dict]:
+        """디렉터리의 파일을 저장소 단위로 묶어 크기와 마지막 수정 시각을 구합니다."""
+        stores: Dict[str, Dict] = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return stores
+        for entry in entries:
+            # 숨김 파일(.lock, .DS_Store 등)은 저장소가 아니며 이름이 비어 디렉터리 자체로 묶이므로 제외
+            if not entry.is_file() or entry.name.startswith("."):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            key = _store_key(os.path.join(self.directory, entry.name.split(".", 1)[0]))
+            store = stores.setdefault(key, {"files": [], "bytes": 0, "last_used": 0.0})
+            store["files"].append(entry.path)
+            store["bytes"] += stat.st_size
+            store["last_used"] = max(store["last_used"], stat.st_mtime)
+        return stores
+
+    def _remove(self, key: str, store: Dict) -> bool:
+        """저장소 파일을 지웁니다. 그 사이에 고정된 저장소는 건너뜁니다."""
+        with self._lock:
+            if self._is_protected(key):
+                return False
+            for file in store["files"]:
+                try:
+                    os.remove(file)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Error deleting {file}: {e}")
+        return True
+
+    def run_once(self) -> List[str]:
+        """
+        한 번 정리합니다.
+
+        Returns:
+            삭제한 저장소 경로 목록 (확장자 제외)
+        """
+        now = time.time()
+        stores = self._scan()
+        removed = []
+
+        with self._lock:
+            candidates = [key for key in stores if not self._is_protected(key)]
+
+        # 1. 오래된 저장소 삭제
+        if self.max_age_seconds is not None:
+            for key in candidates:
+                if now - stores[key]["last_used"] > self.max_age_seconds and self._remove(key, stores[key]):
+                    removed.append(key)
+
+        # 2. 용량 상한을 넘으면 가장 오래 수정되지 않은 저장소부터 삭제
+        if self.max_bytes is not None:
+            remaining = {key: store for key, store in stores.items() if key not in removed}
+            total = sum(store["bytes"] for store in remaining.values())
+            victims = sorted(
+                (key for key in candidates if key in remaining),
+                key=lambda key: remaining[key]["last_used"]
+            )
+            for key in victims:
+                if total <= self.max_bytes:
+                    break
+                if self._remove(key, remaining[key]):
+                    removed.append(key)
+                    total -= remaining[key]["bytes"]
+            if total > self.max_bytes:
+                print(f"⚠️ 벡터 저장소 용량({total:,}B)이 상한({self.max_bytes:,}B)을 넘지만 고정된 저장소뿐이라 지우지 않았습니다.")
+
+        return removed
+
+    def start_background(self):
+        """주기적으로 정리하는 데몬 스레드를 시작합니다 (한 번만 시작됨)."""
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run_loop, name="vectorstore-janitor", daemon=True)
+        self._worker.start()
+
+    def _run_loop(self):
+        while True:
+            try:
+                removed = self.run_once()
+                if removed:
+                    print(f"🧹 오래된 벡터 저장소 {len(removed)}개를 정리했습니다.")
+            except Exception as e:
+                print(f"벡터 저장소 정리 중 오류 발생: {e}")
+            time.sleep(self.interval_seconds)
+
+
+@shared_resource
+def get_store_janitor() -> StoreJanitor:
+    """전역 인덱스를 보존하도록 설정한 정리 작업을 만들고 백그라운드 정리를 시작합니다."""
+    janitor = StoreJanitor()
+    janitor.pin(GLOBAL_STORE_PATH)
+    janitor.start_background()
+    return janitor
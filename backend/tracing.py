@@ -0,0 +1,288 @@
+# backend/tracing.py
+# 파이프라인 단계별 지연 시간, 바이트 수, 토큰 사용량을 스팬 단위로 기록합니다.
+#
+#     with span("dbpia_search", query=query) as s:
+#         content = fetch()
+#         s.add("bytes", len(content))
+#
+# 끝난 스팬은 METRICS_PATH에 한 줄에 하나씩 JSON으로 덧붙이며, 단계별 백분위 요약은
+# summarize() 또는 `python -m backend.tracing [metrics.jsonl]`로 확인합니다.
+# 파일이 METRICS_MAX_BYTES를 넘으면 METRICS_PATH.1로 옮기고 새 파일에 씁니다 (이전 .1은 지워짐).
+import argparse
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from backend.disk_cache import CACHE_DIR
+from backend.resources import shared_resource
+
+METRICS_PATH = os.getenv("PIPELINE_METRICS_PATH", os.path.join(CACHE_DIR, "pipeline_metrics.jsonl"))
+TRACING_ENABLED = os.getenv("PIPELINE_TRACING", "1") != "0"
+# 지표 파일 하나의 크기 상한. 넘으면 한 세대(.1)만 남기고 교체
+METRICS_MAX_BYTES = int(os.getenv("PIPELINE_METRICS_MAX_BYTES", 16 * 1024 * 1024))
+ROTATED_SUFFIX = ".1"
+# 요약에 보여줄 지연 시간 백분위
+SUMMARY_PERCENTILES = (50, 90, 95, 99)
+# OpenAI 응답의 usage에서 더해 둘 필드
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """파이프라인 한 단계의 실행 기록입니다. 같은 요청의 스팬은 trace_id를 공유합니다."""
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.started_at = time.time()
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.counters: Dict[str, float] = {}
+        self.duration_ms: Optional[float] = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def set(self, **attributes):
+        """속성(캐시 여부, 상태 코드 등)을 기록합니다. 같은 이름이면 덮어씁니다."""
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def add(self, name: str, amount: float):
+        """바이트 수, 토큰 수 같은 카운터에 더합니다. 요약에서는 단계별 합계로 보여줍니다."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_usage(self, usage):
+        """OpenAI 응답의 usage(prompt/completion/total 토큰 수)를 더합니다. usage가 없으면 무시합니다."""
+        if usage is None:
+            return
+        for field in USAGE_FIELDS:
+            value = getattr(usage, field, None)
+            if value:
+                self.add(field, value)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def end(self):
+        """스팬을 끝내고 기록합니다. 두 번 호출해도 한 번만 기록됩니다."""
+        with self._lock:
+            if self.duration_ms is not None:
+                return
+            self.duration_ms = self.elapsed_ms()
+        if TRACING_ENABLED:
+            get_recorder().record(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "started_at": self.started_at,
+                "duration_ms": self.duration_ms,
+                "attributes": dict(self.attributes),
+                "counters": dict(self.counters),
+            }
+
+
+def current_span() -> Optional[Span]:
+    """지금 실행 중인 스팬을 반환합니다. 없으면 None"""
+    return _current_span.get()
+
+
+def record_usage(usage):
+    """현재 스팬에 OpenAI 응답의 토큰 사용량을 더합니다. 스팬 밖이면 무시합니다."""
+    current = current_span()
+    if current is not None:
+        current.record_usage(usage)
+
+
+def start_span(name: str, **attributes) -> Span:
+    """
+    현재 스팬의 자식 스팬을 시작하되 현재 스팬으로 바꾸지는 않습니다. 끝낼 때 end()를 호출해야 합니다.
+
+    제너레이터처럼 yield 사이에 호출한 쪽 코드가 실행되는 곳에서 씁니다.
+    """
+    return Span(name, current_span(), attributes)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """블록 실행을 스팬으로 기록합니다. 블록 안에서 시작한 스팬은 이 스팬의 자식이 됩니다."""
+    current = start_span(name, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def bind_context(fn: Callable) -> Callable:
+    """다른 스레드에서 실행할 함수가 현재 스팬을 부모로 이어받도록 컨텍스트를 묶습니다."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+class MetricsRecorder:
+    """끝난 스팬을 지표 파일에 덧붙이고, 최근 스팬을 메모리에 보관합니다."""
+
+    def __init__(self, path: Optional[str] = METRICS_PATH, max_recent: int = 10_000, max_bytes: int = METRICS_MAX_BYTES):
+        """
+        Args:
+            path: 지표 파일 경로 (None이면 파일에 쓰지 않음)
+            max_recent: 메모리에 보관할 최근 스팬 수
+            max_bytes: 지표 파일 크기 상한. 넘으면 path.1로 옮기고 새 파일에 씀
+        """
+        self.path = path
+        self.max_recent = max_recent
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._recent: List[Dict[str, Any]] = []
+        self._size: Optional[int] = None
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def record(self, finished: Span):
+        record = finished.to_dict()
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._recent.append(record)
+            if len(self._recent) > self.max_recent:
+                del self._recent[:len(self._recent) - self.max_recent]
+            if self.path:
+                try:
+                    self._append(line.encode("utf-8"))
+                except OSError as e:
+                    print(f"⚠️ 파이프라인 지표를 기록하지 못했습니다: {e}")
+
+    def _append(self, data: bytes):
+        """파일에 덧붙입니다. 크기 상한을 넘게 되면 먼저 .1로 옮깁니다. 잠금을 잡은 채 호출합니다."""
+        if self._size is None:
+            self._size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if self._size and self._size + len(data) > self.max_bytes:
+            os.replace(self.path, self.path + ROTATED_SUFFIX)
+            self._size = 0
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self._size += len(data)
+
+    def recent(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._recent)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """이 프로세스에서 기록한 최근 스팬의 단계별 요약"""
+        return summarize(self.recent())
+
+
+@shared_resource
+def get_recorder() -> MetricsRecorder:
+    """METRICS_PATH에 쓰는 지표 기록기를 반환합니다."""
+    return MetricsRecorder()
+
+
+def load_spans(path: str = METRICS_PATH) -> List[Dict[str, Any]]:
+    """
+    지표 파일의 스팬을 읽습니다. 교체해 둔 이전 파일(path.1)이 있으면 그것부터 읽습니다.
+    깨진 줄(쓰는 중에 중단된 줄 등)은 건너뜁니다.
+    """
+    spans = []
+    for file_path in (path + ROTATED_SUFFIX, path):
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        spans.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            pass
+    return spans
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """정렬된 값의 백분위 (선형 보간)"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * percentile / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(spans: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    스팬을 단계(이름)별로 묶어 요약합니다.
+
+    Returns:
+        단계 이름 -> {"count", "errors", "p50_ms", ..., "max_ms", 카운터별 합계}
+    """
+    durations: Dict[str, List[float]] = defaultdict(list)
+    totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    errors: Dict[str, int] = defaultdict(int)
+    for record in spans:
+        if record.get("duration_ms") is None:
+            continue
+        name = record["name"]
+        durations[name].append(record["duration_ms"])
+        if "error" in record.get("attributes", {}):
+            errors[name] += 1
+        for key, value in record.get("counters", {}).items():
+            totals[name][key] += value
+
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        stage = {"count": len(values), "errors": errors[name]}
+        for percentile in SUMMARY_PERCENTILES:
+            stage[f"p{percentile}_ms"] = _percentile(values, percentile)
+        stage["max_ms"] = values[-1]
+        stage.update(totals[name])
+        summary[name] = stage
+    return summary
+
+
+def format_summary(summary: Dict[str, Dict[str, Any]]) -> str:
+    """요약을 사람이 읽기 좋은 표로 만듭니다 (p50이 느린 단계부터)."""
+    lines = []
+    for name, stage in sorted(summary.items(), key=lambda item: item[1]["p50_ms"], reverse=True):
+        latencies = "  ".join(f"p{p} {stage[f'p{p}_ms']:9.1f}ms" for p in SUMMARY_PERCENTILES)
+        extras = "  ".join(
+            f"{key} {value:,.0f}" for key, value in stage.items()
+            if key not in ("count", "errors", "max_ms") and not key.endswith("_ms")
+        )
+        lines.append(f"{name:<20} n={stage['count']:<6} err={stage['errors']:<4} {latencies}  {extras}".rstrip())
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인 단계별 지연 시간 요약")
+    parser.add_argument("path", nargs="?", default=METRICS_PATH, help="지표 파일 (기본값: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+
+    summary = summarize(load_spans(args.path))
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    elif summary:
+        print(format_summary(summary))
+    else:
+        print(f"기록된 스팬이 없습니다: {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,76 +1,487 @@
 import faiss
 import numpy as np
-from openai import OpenAI
-import tiktoken
 import json
 import os
-from typing import List, Dict, Any
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Set, Tuple
+from backend.embeddings import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MAX_BATCH_TOKENS,
+    EMBEDDING_MODEL,
+    get_default_embedder,
+    get_embedding_cache,
+    iter_batches,
+)
+from backend.paper_records import (
+    BinaryPaperRecords,
+    JsonPaperRecords,
+    select_fields,
+    write_binary_records,
+    write_json_records,
+)
+from backend.resources import get_encoding, shared_resource
+from backend.sentences import join_spans, segment_sentences_batch, select_key_spans
+from backend.tracing import span
+
+try:
+    import fcntl
+except ImportError:
+    # Windows에는 없으며, 그때는 프로세스 간 잠금 없이 저장
+    fcntl = None
+
+VECTORSTORE_DIR = os.getenv("VECTORSTORE_DIR", "vectorstore")
+# 모든 검색이 공유하는 전역 논문 인덱스 경로
+GLOBAL_STORE_PATH = os.path.join(VECTORSTORE_DIR, "global_papers")
+# 예전 방식(검색마다 생성)의 저장소 파일 접두사
+LEGACY_STORE_PREFIX = "paper_vectors_"
+# link_url이 없을 때 DBpia가 돌려주는 기본 링크
+DEFAULT_DBPIA_LINK = "https://www.dbpia.co.kr"
+
+# 인덱스 백엔드: 정규화 벡터의 내적(코사인 유사도)을 사용
+INDEX_BACKENDS = ("flat", "hnsw", "ivf")
+DEFAULT_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "flat")
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+IVF_NLIST = 1024
+IVF_NPROBE = 16
+# IVF 학습에 권장되는 클러스터당 최소 벡터 수
+IVF_MIN_POINTS_PER_LIST = 39
+# 코사인 유사도 하한. 단위 벡터에서 예전 기준(L2 제곱 거리 < 0.5)과 같은 값
+DEFAULT_MIN_SIMILARITY = 0.75
+# 임계값 필터링을 고려해 k의 몇 배를 가져올지
+DEFAULT_OVERFETCH = 2
+# 저장소를 메모리 맵으로 읽을지 여부 (여러 세션/프로세스가 같은 페이지를 공유)
+DEFAULT_LOAD_MMAP = os.getenv("VECTOR_STORE_MMAP", "1") != "0"
+# 인덱스 벡터를 복사하지 않고 파일에 매핑하는 읽기 전용 플래그 (예전 FAISS는 IVF 목록만 매핑)
+MMAP_IO_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+# 메타데이터 저장 형식: 'binary'(.papers) 또는 'json'(.json + .offsets). 읽기는 둘 다 지원.
+# binary는 파일이 작고 일부 필드만 빨리 읽지만, 초록 압축/해제 때문에 전체 저장과 로드는
+# json보다 느려서(benchmarks/bench_metadata.py) 기본값은 json
+METADATA_FORMATS = ("binary", "json")
+DEFAULT_METADATA_FORMAT = os.getenv("VECTOR_STORE_METADATA_FORMAT", "json")
+# 형식별로 쓰는 메타데이터 파일 확장자
+METADATA_EXTENSIONS = {"binary": (".papers",), "json": (".json", ".offsets")}
+
+# add_papers가 논문에 함께 저장하는 초록의 문장 위치, 컨텍스트용 핵심 내용과 그 토큰 수
+SENTENCE_SPANS_FIELD = "sentence_spans"
+KEY_CONTENT_FIELD = "key_content"
+KEY_TOKENS_FIELD = "key_tokens"
+# 핵심 문장으로 고를 (처음 문장 수, 마지막 문장 수)
+EMBEDDING_KEY_SENTENCES = (3, 2)
+CONTEXT_KEY_SENTENCES = (2, 1)
+
+
+def build_index(backend: str, dimension: int, train_vectors: Optional[np.ndarray] = None) -> faiss.Index:
+    """
+    내적(METRIC_INNER_PRODUCT) 기반 FAISS 인덱스를 만듭니다. 반환값은 IndexIDMap2로 감싸져 있습니다.
+
+    Args:
+        backend: 'flat'(전수 탐색), 'hnsw'(그래프 기반 근사 탐색), 'ivf'(클러스터 기반 근사 탐색)
+        dimension: 벡터 차원
+        train_vectors: IVF 학습용 벡터. 없으면 학습되지 않은 인덱스를 반환
+
+    Returns:
+        id 매핑 인덱스
+    """
+    if backend == "flat":
+        base = faiss.IndexFlatIP(dimension)
+    elif backend == "hnsw":
+        base = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        base.hnsw.efSearch = HNSW_EF_SEARCH
+    elif backend == "ivf":
+        # 학습 데이터가 적으면 클러스터 수를 줄임
+        n_train = 0 if train_vectors is None else len(train_vectors)
+        nlist = max(1, min(IVF_NLIST, n_train // IVF_MIN_POINTS_PER_LIST))
+        quantizer = faiss.IndexFlatIP(dimension)
+        base = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        # 양자화기의 소유권을 인덱스로 넘겨 파이썬 객체가 사라져도 유지되도록 함
+        quantizer.this.disown()
+        base.own_fields = True
+        base.nprobe = min(IVF_NPROBE, nlist)
+        if n_train:
+            base.train(train_vectors)
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 백엔드입니다: {backend} (가능한 값: {', '.join(INDEX_BACKENDS)})")
+    return faiss.IndexIDMap2(base)
+
+
+def effective_backend(backend: str, n_vectors: int = 0) -> str:
+    """
+    벡터가 n_vectors개일 때 실제로 쓸 백엔드를 반환합니다.
+
+    IVF는 학습 데이터가 IVF_MIN_POINTS_PER_LIST * IVF_NLIST개 모일 때까지 flat을 씁니다.
+    작은 배치로 학습하면 클러스터 수가 그 크기에 고정되기 때문입니다.
+    """
+    if backend == "ivf" and n_vectors < IVF_MIN_POINTS_PER_LIST * IVF_NLIST:
+        return "flat"
+    return backend
+
+
+def detect_backend(index: faiss.Index) -> str:
+    """인덱스 객체에서 백엔드 이름을 알아냅니다."""
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap2) else index
+    if isinstance(base, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(base, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+@contextmanager
+def store_file_lock(path: str, shared: bool = False):
+    """
+    저장소({path}.lock)에 프로세스 간 파일 잠금을 겁니다. 저장할 때는 배타적으로, 읽을 때는 공유로 잠가
+    다른 프로세스가 저장하는 도중의 파일을 섞어 읽지 않게 합니다. fcntl이 없으면 잠그지 않습니다.
+    """
+    directory = os.path.dirname(path)
+    if fcntl is None or (shared and directory and not os.path.isdir(directory)):
+        yield
+        return
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _index_file_stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    """저장소 인덱스 파일의 (inode, 수정 시각, 크기). 저장은 파일을 교체하므로 저장할 때마다 바뀝니다."""
+    try:
+        stat = os.stat(f"{path}.index")
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def paper_key(paper: Dict[str, Any]) -> str:
+    """중복 판별용 키를 반환합니다. DBpia 링크가 있으면 링크, 없으면 정규화한 제목을 사용합니다."""
+    link = (paper.get('link') or '').strip().rstrip('/')
+    if link and link != DEFAULT_DBPIA_LINK:
+        return f"link:{link}"
+    title = ' '.join((paper.get('title') or '').split()).lower()
+    return f"title:{title}"
+
+
+def preprocess_papers(papers: Sequence[Dict[str, Any]], encoding) -> List[Dict[str, Any]]:
+    """
+    저장할 논문을 전처리합니다. 초록을 한 번에 문장 단위로 나누고, 문장 위치와 컨텍스트용 핵심 내용,
+    그 토큰 수를 덧붙인 사본을 반환합니다 (입력 논문은 바꾸지 않음).
+    """
+    spans = segment_sentences_batch([paper['abstract'] for paper in papers])
+    prepared = [
+        {
+            **paper,
+            SENTENCE_SPANS_FIELD: paper_spans,
+            KEY_CONTENT_FIELD: join_spans(paper['abstract'], select_key_spans(paper_spans, *CONTEXT_KEY_SENTENCES)),
+        }
+        for paper, paper_spans in zip(papers, spans)
+    ]
+    encoded = encoding.encode_batch([paper[KEY_CONTENT_FIELD] for paper in prepared])
+    for paper, tokens in zip(prepared, encoded):
+        paper[KEY_TOKENS_FIELD] = len(tokens)
+    return prepared
+
+
+def embedding_text(paper: Dict[str, Any]) -> str:
+    """임베딩할 텍스트(초록의 핵심 문장)를 전처리해 둔 문장 위치로 만듭니다."""
+    key_spans = select_key_spans(paper[SENTENCE_SPANS_FIELD], *EMBEDDING_KEY_SENTENCES)
+    return join_spans(paper['abstract'], key_spans)
+
+
+def pack_within_budget(token_counts: Sequence[int], max_tokens: int) -> List[int]:
+    """
+    순서대로 토큰 예산 안에 들어가는 항목을 고릅니다. 들어가지 않는 항목은 건너뛰고 다음 항목을 봅니다.
+
+    Returns:
+        고른 항목의 위치 (입력 순서)
+    """
+    chosen = []
+    remaining = max_tokens
+    for i, tokens in enumerate(token_counts):
+        if tokens <= remaining:
+            chosen.append(i)
+            remaining -= tokens
+    return chosen
+
 
 class PaperVectorStore:
-    def __init__(self, dimension: int = 1536):
+    def __init__(
+        self,
+        dimension: int = 1536,
+        embedder=None,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_batch_tokens: int = EMBEDDING_MAX_BATCH_TOKENS,
+        use_embedding_cache: bool = True,
+        index_backend: str = DEFAULT_INDEX_BACKEND,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+        overfetch: int = DEFAULT_OVERFETCH
+    ):
+        """
+        Args:
+            dimension: 임베딩 차원
+            embedder: 임베딩 백엔드 (기본값: EMBEDDING_BACKEND 환경 변수에 따름)
+            batch_size: 임베딩 요청당 최대 텍스트 수
+            max_batch_tokens: 임베딩 요청당 최대 토큰 수
+            use_embedding_cache: 공유 임베딩 캐시 사용 여부
+            index_backend: 인덱스 백엔드 ('flat', 'hnsw', 'ivf')
+            min_similarity: 검색 결과로 인정할 최소 코사인 유사도
+            overfetch: 임계값 필터링 전에 k의 몇 배를 가져올지
+        """
         self.dimension = dimension
-        self.index = faiss.IndexFlatL2(dimension)
+        self.index_backend = index_backend
+        self.min_similarity = min_similarity
+        self.overfetch = overfetch
+        # 논문 id는 self.papers에서의 위치와 같으며, 추가만 하므로 바뀌지 않음
+        self.index = build_index(effective_backend(index_backend), dimension)
         self.papers = []
-        self.client = OpenAI()
-        self.encoding = tiktoken.encoding_for_model("text-embedding-3-small")
-        
-    def add_papers(self, papers: List[Dict[str, Any]]):
-        """논문을 벡터 저장소에 추가합니다."""
-        texts = []
-        for paper in papers:
-            if paper.get('abstract'):
-                # 초록에서 핵심 내용 추출
-                abstract = paper['abstract']
-                # 초록을 문장 단위로 분리
-                sentences = abstract.split('.')
-                # 핵심 문장 선택 (처음 3문장과 마지막 2문장)
-                key_sentences = sentences[:3] + sentences[-2:] if len(sentences) > 5 else sentences
-                # 핵심 내용으로 구성
-                key_content = '. '.join(key_sentences).strip()
-                texts.append(key_content)
-                self.papers.append(paper)
+        self._keys: Dict[str, int] = {}
+        # 임베딩 중이라 아직 인덱스에 없는 논문의 키 (동시에 추가해도 한 번만 임베딩)
+        self._pending_keys: Set[str] = set()
+        # 메모리 맵으로 로드한 인덱스와 메타데이터는 읽기 전용 (추가할 때 복사본으로 바꿈)
+        self.read_only = False
+        # 일부 필드만 로드했으면 그 필드 목록 (이런 저장소는 수정하거나 저장할 수 없음)
+        self.loaded_fields: Optional[List[str]] = None
+        # 인덱스를 메모리 맵으로 읽었으면 그 저장소 경로 (추가하기 전에 매핑 없이 다시 읽음)
+        self._mapped_path: Optional[str] = None
+        # 저장소 경로별로 마지막에 읽거나 쓴 인덱스 파일 상태 (그 뒤에 다른 프로세스가 저장했는지 판별)
+        self._disk_stamps: Dict[str, Tuple[int, int, int]] = {}
+        self._lock = threading.RLock()
+        self.embedder = embedder or get_default_embedder()
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.embedding_cache = get_embedding_cache() if use_embedding_cache else None
+        self.encoding = get_encoding(EMBEDDING_MODEL)
+
+    def embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        텍스트를 배치 단위로 임베딩합니다.
+
+        임베딩 캐시에 있는 텍스트는 요청하지 않고, 나머지만 요청마다 batch_size개,
+        max_batch_tokens 토큰을 넘지 않도록 묶어 보냅니다. 결과 행은 입력 순서대로 반환합니다.
+        """
+        with span("embedding", model=self.embedder.model) as stage:
+            stage.add("texts", len(texts))
+            vectors = np.zeros((len(texts), self.dimension), dtype='float32')
+            missing = list(range(len(texts)))
+            if self.embedding_cache is not None:
+                cached = self.embedding_cache.get_many(self.embedder.model, texts, self.dimension)
+                for i, vector in cached.items():
+                    vectors[i] = vector
+                missing = [i for i in missing if i not in cached]
+            stage.add("cache_hits", len(texts) - len(missing))
+            if not missing:
+                return vectors
+
+            missing_texts = [texts[i] for i in missing]
+            token_counts = [len(tokens) for tokens in self.encoding.encode_batch(missing_texts)]
+            for batch in iter_batches(token_counts, self.batch_size, self.max_batch_tokens):
+                batch_texts = [missing_texts[i] for i in batch]
+                batch_vectors = self.embedder.embed(batch_texts)
+                stage.add("requests", 1)
+                vectors[[missing[i] for i in batch]] = batch_vectors
+                if self.embedding_cache is not None:
+                    self.embedding_cache.set_many(self.embedder.model, batch_texts, batch_vectors)
+            return vectors
         
-        if not texts:
+    def add_papers(self, papers: List[Dict[str, Any]]) -> int:
+        """
+        논문을 벡터 저장소에 추가합니다.
+
+        이미 저장된 논문(같은 DBpia 링크 또는 제목)이나 다른 스레드가 추가하는 중인 논문은 건너뜁니다.
+        임베딩(네트워크 요청)하는 동안에는 잠금을 풀어 두므로 그동안에도 검색과 다른 추가가 진행됩니다.
+        그 사이 save가 다른 프로세스의 논문을 받아 왔으면, 임베딩한 논문은 그 뒤에 이어 붙이고
+        이미 받아 온 논문은 건너뜁니다.
+
+        Returns:
+            새로 추가된 논문 수
+        """
+        with self._lock:
+            self._materialize()
+            new_papers = []
+            new_keys = []
+            for paper in papers:
+                if not paper.get('abstract'):
+                    continue
+                key = paper_key(paper)
+                if key in self._keys or key in self._pending_keys:
+                    continue
+                self._pending_keys.add(key)
+                new_keys.append(key)
+                new_papers.append(paper)
+
+        if not new_papers:
+            return 0
+
+        try:
+            # 문장 분리와 핵심 문장 선택은 여기서 한 번만 하고 결과를 논문과 함께 저장
+            new_papers = preprocess_papers(new_papers, self.encoding)
+            # 텍스트를 배치로 묶어 벡터로 변환
+            vectors = self.embed_texts([embedding_text(paper) for paper in new_papers])
+            # 내적이 코사인 유사도가 되도록 정규화
+            faiss.normalize_L2(vectors)
+        except Exception:
+            with self._lock:
+                self._pending_keys.difference_update(new_keys)
+            raise
+
+        with self._lock:
+            self._pending_keys.difference_update(new_keys)
+            keep = [i for i, key in enumerate(new_keys) if key not in self._keys]
+            if not keep:
+                return 0
+            new_keys = [new_keys[i] for i in keep]
+            new_papers = [new_papers[i] for i in keep]
+            # FAISS 인덱스에 벡터 추가 (입력 순서 유지, id = 논문 위치)
+            ids = np.arange(len(self.papers), len(self.papers) + len(new_papers), dtype='int64')
+            self.index.add_with_ids(vectors[keep], ids)
+            for key, paper_id in zip(new_keys, ids):
+                self._keys[key] = int(paper_id)
+            self.papers.extend(new_papers)
+            self._train_ivf_if_ready()
+            return len(new_papers)
+
+    def _train_ivf_if_ready(self):
+        """IVF 백엔드가 아직 flat 인덱스를 쓰고 있고 벡터가 충분히 모였으면 모든 벡터로 학습해 다시 만듭니다."""
+        backend = effective_backend(self.index_backend, self.index.ntotal)
+        if backend == detect_backend(self.index):
             return
-        
-        # OpenAI Embedding API를 사용하여 텍스트를 벡터로 변환
-        embeddings = []
-        for text in texts:
-            response = self.client.embeddings.create(
-                model="text-embedding-3-small",
-                input=text
-            )
-            embeddings.append(response.data[0].embedding)
-        
-        # FAISS 인덱스에 벡터 추가
-        vectors = np.array(embeddings).astype('float32')
-        self.index.add(vectors)
+        ids = faiss.vector_to_array(self.index.id_map).astype('int64')
+        vectors = faiss.downcast_index(self.index.index).reconstruct_n(0, self.index.ntotal)
+        rebuilt = build_index(backend, self.dimension, train_vectors=vectors)
+        rebuilt.add_with_ids(vectors, ids)
+        self.index = rebuilt
     
-    def search_similar(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        """쿼리와 가장 유사한 논문을 검색합니다."""
-        # 쿼리를 벡터로 변환
-        response = self.client.embeddings.create(
-            model="text-embedding-3-small",
-            input=query
+    def _check_complete(self):
+        if self.loaded_fields is not None:
+            raise ValueError("일부 필드만 로드한 저장소는 수정하거나 저장할 수 없습니다.")
+
+    def _materialize(self):
+        """메모리 맵으로 읽은 저장소를 수정할 수 있도록 인덱스와 메타데이터를 메모리로 복사합니다."""
+        self._check_complete()
+        if not self.read_only:
+            return
+        if self._mapped_path is not None:
+            # 매핑된 인덱스는 직렬화해 복사해도 IVF 목록이 원래 파일을 가리켜 추가가 파일에 쓰이므로,
+            # 같은 저장소를 매핑 없이 다시 읽어 메모리에 올림. 로드한 뒤 다른 프로세스가 저장했으면
+            # 그 사이 추가된 논문까지 함께 읽힘
+            with store_file_lock(self._mapped_path, shared=True):
+                self._adopt(self._read_saved(self._mapped_path))
+            self._mapped_path = None
+        else:
+            self.papers = list(self.papers)
+            self._keys = {paper_key(paper): i for i, paper in enumerate(self.papers)}
+        self.read_only = False
+
+    def _read_saved(self, path: str) -> 'PaperVectorStore':
+        """이 저장소와 같은 설정으로 저장된 저장소를 메모리로 읽습니다. 호출하는 쪽이 파일 잠금을 잡고 있어야 합니다."""
+        return type(self)._read(
+            path,
+            dimension=self.dimension,
+            embedder=self.embedder,
+            use_embedding_cache=False,
+            index_backend=self.index_backend,
         )
-        query_vector = np.array([response.data[0].embedding]).astype('float32')
-        
-        # 유사한 벡터 검색 (k를 2배로 증가)
-        distances, indices = self.index.search(query_vector, k * 2)
-        
-        # 결과 반환 (거리 기반 필터링 추가)
-        results = []
-        for idx, distance in zip(indices[0], distances[0]):
-            if idx < len(self.papers) and distance < 0.5:  # 거리 임계값 추가
-                results.append(self.papers[idx])
-            if len(results) >= k:  # 원하는 수의 결과에 도달하면 중단
-                break
+
+    def _adopt(self, other: 'PaperVectorStore'):
+        """다른 저장소 객체의 인덱스와 논문으로 바꿉니다."""
+        self.index = other.index
+        self.index_backend = other.index_backend
+        self.papers = other.papers
+        self._keys = other._keys
+        self._disk_stamps.update(other._disk_stamps)
+
+    def _reconstruct(self, ids: Sequence[int]) -> np.ndarray:
+        """인덱스에 저장된 벡터를 id로 꺼냅니다."""
+        base = faiss.downcast_index(self.index.index)
+        if isinstance(base, faiss.IndexIVF):
+            base.make_direct_map()
+        return np.vstack([self.index.reconstruct(int(i)) for i in ids]).astype('float32')
+
+    def _merge_saved(self, path: str):
+        """
+        다른 프로세스가 path에 저장한 저장소를 읽어 오고, 여기에만 있는 논문을 그 뒤에 이어 붙입니다.
+
+        저장소는 추가만 하므로 파일의 논문 id(위치)는 그대로 두고, 여기에만 있는 논문의 id를 새로 매깁니다.
+        """
+        saved = self._read_saved(path)
+        own = [i for i, paper in enumerate(self.papers) if paper_key(paper) not in saved._keys]
+        if own:
+            ids = np.arange(len(saved.papers), len(saved.papers) + len(own), dtype='int64')
+            saved.index.add_with_ids(self._reconstruct(own), ids)
+            for i, paper_id in zip(own, ids):
+                saved._keys[paper_key(self.papers[i])] = int(paper_id)
+                saved.papers.append(self.papers[i])
+        self._adopt(saved)
+        self._train_ivf_if_ready()
+
+    def search_similar(
+        self,
+        query: str,
+        k: int = 5,
+        min_similarity: Optional[float] = None,
+        overfetch: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        쿼리와 가장 유사한 논문을 검색합니다.
+
+        Args:
+            query: 검색 쿼리
+            k: 반환할 최대 논문 수
+            min_similarity: 최소 코사인 유사도 (기본값: 저장소 설정)
+            overfetch: k의 몇 배를 후보로 가져올지 (기본값: 저장소 설정)
+
+        Returns:
+            유사도가 높은 순서의 논문 목록
+        """
+        min_similarity = self.min_similarity if min_similarity is None else min_similarity
+        overfetch = self.overfetch if overfetch is None else overfetch
         
-        return results
+        with span("vector_search", backend=self.index_backend) as stage:
+            # 쿼리를 벡터로 변환
+            query_vector = self.embed_texts([query])
+            faiss.normalize_L2(query_vector)
+            
+            with self._lock:
+                if self.index.ntotal == 0:
+                    return []
+                distances, indices = self.index.search(query_vector, k * max(1, overfetch))
+                # save가 다른 프로세스의 저장소와 합치면 인덱스와 논문 목록이 함께 바뀌므로 같은 시점의 목록을 씀
+                papers = self.papers
+            
+            # 결과 반환 (유사도 기반 필터링)
+            results = []
+            for idx, similarity in zip(indices[0], distances[0]):
+                if 0 <= idx < len(papers) and similarity >= min_similarity:
+                    results.append(papers[idx])
+                if len(results) >= k:  # 원하는 수의 결과에 도달하면 중단
+                    break
+            stage.add("results", len(results))
+            
+            return results
     
+    def _context_entries(self, papers: Sequence[Dict[str, Any]]) -> List[tuple]:
+        """
+        논문마다 (제목, 핵심 내용, 토큰 수)를 구합니다. 초록이 없는 논문은 제외합니다.
+
+        add_papers에서 저장해 둔 핵심 내용과 토큰 수를 쓰고, 없으면(예전 저장소) 한 번에 모아 전처리합니다.
+        """
+        papers = [paper for paper in papers if paper.get('abstract')]
+        missing = [i for i, paper in enumerate(papers) if paper.get(KEY_TOKENS_FIELD) is None]
+        if missing:
+            for i, paper in zip(missing, preprocess_papers([papers[i] for i in missing], self.encoding)):
+                papers[i] = paper
+        return [(paper.get('title', ''), paper[KEY_CONTENT_FIELD], paper[KEY_TOKENS_FIELD]) for paper in papers]
+
     def get_context_within_token_limit(self, papers: List[Dict[str, Any]], max_tokens: int) -> str:
         """
         주어진 논문 목록에서 토큰 제한 내에서 컨텍스트를 구성합니다.
+
+        논문 순서(유사도 순)대로 담되, 남은 토큰보다 큰 논문은 건너뛰고 뒤의 더 짧은 논문을 계속 담습니다.
         
         Args:
             papers: 논문 목록
@@ -79,82 +490,159 @@ class PaperVectorStore:
         Returns:
             구성된 컨텍스트 문자열
         """
-        context = []
-        current_tokens = 0
-        
-        for paper in papers:
-            # 각 논문의 초록에서 핵심 내용 추출
-            abstract = paper.get('abstract', '')
-            if not abstract:
-                continue
-                
-            # 초록을 문장 단위로 분리
-            sentences = abstract.split('.')
-            # 핵심 문장 선택 (처음 2문장과 마지막 1문장으로 더 줄임)
-            key_sentences = sentences[:2] + sentences[-1:] if len(sentences) > 3 else sentences
-            # 핵심 내용으로 구성
-            key_content = '. '.join(key_sentences).strip()
-            
-            # 핵심 내용의 토큰 수 계산
-            key_tokens = len(self.encoding.encode(key_content))
-            
-            # 토큰 제한을 초과하지 않는 경우에만 추가
-            if current_tokens + key_tokens <= max_tokens:
-                context.append(f"제목: {paper.get('title', '')}\n핵심 내용: {key_content}\n")
-                current_tokens += key_tokens
-            else:
-                break
-        
+        entries = self._context_entries(papers)
+        chosen = pack_within_budget([tokens for _, _, tokens in entries], max_tokens)
+        context = [f"제목: {entries[i][0]}\n핵심 내용: {entries[i][1]}\n" for i in chosen]
         return "\n".join(context)
     
-    def save(self, path: str):
-        """벡터 저장소를 파일로 저장합니다."""
+    def save(self, path: str, metadata_format: str = DEFAULT_METADATA_FORMAT):
+        """
+        벡터 저장소를 파일로 저장합니다. 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 교체 방식으로 씁니다.
+
+        여러 프로세스가 같은 경로에 저장해도 서로의 논문을 잃지 않도록 파일 잠금을 잡고, 마지막으로
+        읽거나 쓴 뒤에 다른 프로세스가 저장했으면 그 논문을 먼저 받아 와 합친 뒤 씁니다.
+
+        Args:
+            path: 저장소 경로 (확장자 제외)
+            metadata_format: 'binary'면 초록을 압축한 .papers 파일, 'json'이면 한 줄에 논문 하나인
+                .json과 줄별 위치를 담은 .offsets 파일로 메타데이터를 씁니다.
+                어느 쪽이든 load(use_mmap=True)가 필요한 논문만 읽을 수 있습니다.
+        """
+        if metadata_format not in METADATA_FORMATS:
+            raise ValueError(f"지원하지 않는 메타데이터 형식입니다: {metadata_format} (가능한 값: {', '.join(METADATA_FORMATS)})")
+        self._check_complete()
         # 디렉토리가 없으면 생성
         os.makedirs(os.path.dirname(path), exist_ok=True)
         
-        # FAISS 인덱스 저장
-        faiss.write_index(self.index, f"{path}.index")
-        
-        # 논문 메타데이터 저장
-        with open(f"{path}.json", 'w', encoding='utf-8') as f:
-            json.dump(self.papers, f, ensure_ascii=False, indent=2)
-        
-        # 검색 ID 저장
-        with open(f"{path}.id", 'w', encoding='utf-8') as f:
-            f.write(os.path.basename(path).split('_')[-1])
+        with self._lock:
+            self._materialize()
+            with store_file_lock(path):
+                stamp = _index_file_stamp(path)
+                if stamp is not None and stamp != self._disk_stamps.get(path):
+                    self._merge_saved(path)
+                
+                # 같은 경로에 동시에 저장해도 임시 파일이 겹치지 않도록 이름에 프로세스와 임의 값을 붙임
+                suffix = f"{os.getpid()}.{uuid.uuid4().hex}.tmp"
+                temp_paths = {
+                    extension: f"{path}{extension}.{suffix}"
+                    for extension in (".index",) + METADATA_EXTENSIONS[metadata_format]
+                }
+                try:
+                    # FAISS 인덱스 저장
+                    faiss.write_index(self.index, temp_paths[".index"])
+                    
+                    # 논문 메타데이터 저장
+                    if metadata_format == "binary":
+                        write_binary_records(temp_paths[".papers"], self.papers)
+                    else:
+                        write_json_records(temp_paths[".json"], temp_paths[".offsets"], self.papers)
+                    
+                    for extension, temp_path in temp_paths.items():
+                        os.replace(temp_path, f"{path}{extension}")
+                finally:
+                    for temp_path in temp_paths.values():
+                        if os.path.exists(temp_path):
+                            os.remove(temp_path)
+                # 다른 형식으로 저장했던 예전 메타데이터는 지워서 로드할 때 헷갈리지 않게 함
+                for other_format, extensions in METADATA_EXTENSIONS.items():
+                    if other_format == metadata_format:
+                        continue
+                    for extension in extensions:
+                        if os.path.exists(f"{path}{extension}"):
+                            os.remove(f"{path}{extension}")
+                self._disk_stamps[path] = _index_file_stamp(path)
     
     @classmethod
-    def load(cls, path: str) -> 'PaperVectorStore':
-        """파일에서 벡터 저장소를 로드합니다."""
-        store = cls()
+    def load(cls, path: str, use_mmap: bool = False, fields: Optional[Iterable[str]] = None, **kwargs) -> 'PaperVectorStore':
+        """
+        파일에서 벡터 저장소를 로드합니다. 메타데이터는 .papers(바이너리)가 있으면 그것을, 없으면 .json을 읽습니다.
+
+        Args:
+            path: 저장소 경로 (확장자 제외)
+            use_mmap: True면 인덱스와 메타데이터를 메모리 맵으로 열어 읽기 전용으로 사용합니다.
+                메타데이터는 검색 결과에 필요한 논문만 읽으며, 논문을 추가할 때 메모리로 복사됩니다.
+            fields: 읽을 메타데이터 필드 (예: ['title', 'link']). 지정하면 나머지 필드는 건너뛰며,
+                이렇게 로드한 저장소는 검색만 할 수 있습니다.
+        """
+        # 다른 프로세스가 저장하는 도중이면 끝날 때까지 기다려 인덱스와 메타데이터가 같은 저장본이 되게 함
+        with store_file_lock(path, shared=True):
+            return cls._read(path, use_mmap=use_mmap, fields=fields, **kwargs)
+
+    @classmethod
+    def _read(cls, path: str, use_mmap: bool = False, fields: Optional[Iterable[str]] = None, **kwargs) -> 'PaperVectorStore':
+        """load의 본체입니다. 파일 잠금은 호출하는 쪽에서 잡습니다."""
+        store = cls(**kwargs)
+        if fields is not None:
+            store.loaded_fields = list(fields)
         
         # FAISS 인덱스 로드
         if os.path.exists(f"{path}.index"):
-            store.index = faiss.read_index(f"{path}.index")
+            index = faiss.read_index(f"{path}.index", MMAP_IO_FLAGS if use_mmap else 0)
+            if index.metric_type == faiss.METRIC_L2:
+                # 예전 형식(정규화하지 않은 L2 인덱스)은 정규화하여 현재 백엔드로 다시 구성
+                index = store._rebuild_from_legacy(index)
+            else:
+                detected = detect_backend(index)
+                # 학습 전이라 flat으로 저장된 IVF 저장소는 설정한 백엔드를 유지
+                if not (detected == "flat" and store.index_backend == "ivf"):
+                    store.index_backend = detected
+                if use_mmap:
+                    store._mapped_path = path
+            store.index = index
+            store._disk_stamps[path] = _index_file_stamp(path)
         
         # 논문 메타데이터 로드
-        if os.path.exists(f"{path}.json"):
+        if os.path.exists(f"{path}.papers"):
+            records = BinaryPaperRecords.open(f"{path}.papers", use_mmap=use_mmap, fields=fields)
+        elif use_mmap:
+            records = JsonPaperRecords.open(f"{path}.json", f"{path}.offsets", fields=fields)
+        else:
+            records = None
+        if records is not None and use_mmap:
+            store.papers = records
+            store.read_only = True
+            return store
+        if records is not None:
+            store.papers = list(records)
+        elif os.path.exists(f"{path}.json"):
             with open(f"{path}.json", 'r', encoding='utf-8') as f:
-                store.papers = json.load(f)
+                store.papers = select_fields(json.load(f), fields)
+        store._keys = {paper_key(paper): i for i, paper in enumerate(store.papers)}
+        # 메타데이터는 메모리에 있어도 인덱스가 매핑되어 있으면 추가 전에 복사해야 함
+        store.read_only = use_mmap
         
         return store
 
-    def cleanup_old_stores(self, max_age_hours: int = 24):
-        """오래된 벡터 저장소를 정리합니다."""
-        import time
-        import glob
-        
-        # vectorstore 디렉토리의 모든 파일 목록 가져오기
-        files = glob.glob("vectorstore/*")
-        
-        for file in files:
-            # 파일의 마지막 수정 시간 확인
-            file_age = time.time() - os.path.getmtime(file)
-            age_hours = file_age / 3600
-            
-            # 지정된 시간보다 오래된 파일 삭제
-            if age_hours > max_age_hours:
-                try:
-                    os.remove(file)
-                except Exception as e:
-                    print(f"Error deleting {file}: {e}") 
\ No newline at end of file
+    def _rebuild_from_legacy(self, index: faiss.Index) -> faiss.Index:
+        """L2 인덱스의 벡터를 꺼내 정규화한 뒤 현재 백엔드의 내적 인덱스로 옮깁니다."""
+        if isinstance(index, faiss.IndexIDMap2):
+            ids = faiss.vector_to_array(index.id_map).astype('int64')
+            base = faiss.downcast_index(index.index)
+        else:
+            # id 매핑이 없던 형식은 행 번호를 id로 사용
+            ids = np.arange(index.ntotal, dtype='int64')
+            base = index
+        if not index.ntotal:
+            return build_index(effective_backend(self.index_backend), index.d)
+        vectors = base.reconstruct_n(0, base.ntotal)
+        faiss.normalize_L2(vectors)
+        rebuilt = build_index(effective_backend(self.index_backend, len(vectors)), index.d, train_vectors=vectors)
+        rebuilt.add_with_ids(vectors, ids)
+        return rebuilt
+
+    @classmethod
+    def load_or_create(cls, path: str, use_mmap: bool = False, **kwargs) -> 'PaperVectorStore':
+        """저장된 벡터 저장소가 있으면 로드하고, 없으면 새로 만듭니다."""
+        if os.path.exists(f"{path}.index"):
+            return cls.load(path, use_mmap=use_mmap, **kwargs)
+        return cls(**kwargs)
+
+
+@shared_resource
+def get_global_store() -> PaperVectorStore:
+    """
+    모든 검색이 공유하는 전역 논문 인덱스를 반환합니다.
+
+    프로세스당 한 번만 디스크에서 로드하며, 이후 검색은 같은 인덱스에 논문을 점진적으로 추가합니다.
+    """
+    return PaperVectorStore.load_or_create(GLOBAL_STORE_PATH, use_mmap=DEFAULT_LOAD_MMAP)
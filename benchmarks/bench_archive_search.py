@@ -0,0 +1,84 @@
+"""
+보관함 전문 검색(PaperStore.search_papers)의 검색 지연 시간을 재고, 조사 처리 결과를 확인합니다.
+
+확인하는 검색어:
+    명사 끝 글자가 조사와 같은 단어("고양이", "필터로")는 원래 단어가 들어간 논문을 찾아야 하고,
+    조사가 붙은 단어("고양이가")는 조사를 뗀 단어가 들어간 논문을 찾아야 합니다.
+    결과가 기대와 다르면 종료 코드 1로 끝납니다.
+
+실행 예시 (저장소 루트에서):
+    python -m benchmarks.bench_archive_search --papers 10000 --rounds 200
+
+임시 디렉터리에 저장하므로 실제 generated_papers.db는 건드리지 않습니다.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from backend.paper_store import PaperStore
+
+WORDS = "이어폰 줄꼬임 현상 분석 연구 실험 결과 모델 제안 방법 데이터 성능 평가 시스템 사용자 효과".split()
+
+# 제목 -> 초록. 조사 처리를 확인하려고 채우기용 논문 사이에 섞어 넣음
+TARGET_PAPERS = {
+    "고양이 상자 선호": "고양이는 왜 좁은 상자를 좋아하는지 관찰하였다.",
+    "고양시 교통 체증": "고양시 출퇴근 시간의 교통 흐름을 분석하였다.",
+    "필터로 걸러낸 소음": "필터로 소음을 줄이는 이어폰을 제안하였다.",
+}
+
+# 검색어 -> 반드시 찾아야 하는 제목, 찾으면 안 되는 제목
+EXPECTED = [
+    ("고양이", {"고양이 상자 선호"}, set()),
+    ("고양이가 상자", {"고양이 상자 선호"}, {"고양시 교통 체증"}),
+    ("필터로", {"필터로 걸러낸 소음"}, set()),
+    ("고양시 교통", {"고양시 교통 체증"}, {"고양이 상자 선호"}),
+]
+
+
+def make_paper(title: str, abstract: str) -> dict:
+    return {"title": title, "abstract": abstract, "introduction": abstract}
+
+
+def fill(store: PaperStore, n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        store.add_paper(make_paper(f"{' '.join(rng.choices(WORDS, k=5))} {i}", " ".join(rng.choices(WORDS, k=120))), "bench")
+    for title, abstract in TARGET_PAPERS.items():
+        store.add_paper(make_paper(title, abstract), "bench")
+
+
+def check(store: PaperStore) -> int:
+    failures = 0
+    for query, required, forbidden in EXPECTED:
+        titles = [paper["title"] for paper in store.search_papers(query)]
+        # 찾아야 하는 논문이 관련도 1위여야 함
+        ok = required <= set(titles) and not forbidden & set(titles) and bool(titles) and titles[0] in required
+        print(f"{'ok  ' if ok else 'FAIL'}  {query!r} -> {titles[:3]}")
+        failures += not ok
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = PaperStore(os.path.join(workdir, "papers.db"), legacy_json_path=None)
+        fill(store, args.papers)
+        failures = check(store)
+        for query, _, _ in EXPECTED:
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                store.search_papers(query)
+            print(f"{query:<14} {(time.perf_counter() - start) / args.rounds * 1000:8.3f} ms/query")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
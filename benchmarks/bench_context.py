@@ -0,0 +1,101 @@
+"""
+get_context_within_token_limit의 컨텍스트 구성 시간과 사용한 토큰 수를 비교합니다.
+
+before: 예전처럼 호출마다 초록을 '.'으로 나누고 토큰을 세며, 예산을 넘는 첫 논문에서 멈춥니다.
+after:  add_papers에서 저장해 둔 핵심 내용과 토큰 수로, 넘치는 논문은 건너뛰며 채웁니다.
+
+실행 예시 (저장소 루트에서):
+    python -m benchmarks.bench_context --calls 500 --k 5 --budget 1000
+
+tiktoken 인코딩 파일이 로컬 캐시에 없으면 처음 한 번 내려받습니다.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from backend.embeddings import LocalEmbedder
+from backend.vector_store import KEY_TOKENS_FIELD, PaperVectorStore, pack_within_budget
+
+WORDS = "이어폰 줄꼬임 현상 분석 연구 실험 결과 모델 제안 방법 데이터 성능 평가 시스템 사용자 효과".split()
+
+
+def make_papers(n: int, seed: int = 0):
+    """문장 수와 길이가 제각각인 가짜 논문을 만듭니다."""
+    rng = random.Random(seed)
+
+    def sentence():
+        return " ".join(rng.choices(WORDS, k=rng.randint(5, 60)))
+
+    return [
+        {
+            "title": f"{' '.join(rng.choices(WORDS, k=5))} {i}",
+            "link": f"https://www.dbpia.co.kr/journal/articleDetail?nodeId=NODE{i:08d}",
+            "abstract": ". ".join(sentence() for _ in range(rng.randint(2, 12))) + ".",
+        }
+        for i in range(n)
+    ]
+
+
+def context_before(store: PaperVectorStore, papers, max_tokens: int):
+    """예전 get_context_within_token_limit. (컨텍스트, 사용한 토큰 수)를 반환합니다."""
+    context = []
+    current_tokens = 0
+    for paper in papers:
+        abstract = paper.get('abstract', '')
+        if not abstract:
+            continue
+        sentences = abstract.split('.')
+        key_sentences = sentences[:2] + sentences[-1:] if len(sentences) > 3 else sentences
+        key_content = '. '.join(key_sentences).strip()
+        key_tokens = len(store.encoding.encode(key_content))
+        if current_tokens + key_tokens <= max_tokens:
+            context.append(f"제목: {paper.get('title', '')}\n핵심 내용: {key_content}\n")
+            current_tokens += key_tokens
+        else:
+            break
+    return "\n".join(context), current_tokens
+
+
+def measure(label: str, build, samples, max_tokens: int):
+    """build(papers, max_tokens)가 (컨텍스트, 사용한 토큰 수)를 반환하면 지연 시간과 토큰 수를 출력합니다."""
+    latencies = []
+    used = []
+    for papers in samples:
+        start = time.perf_counter()
+        _, tokens = build(papers, max_tokens)
+        latencies.append(time.perf_counter() - start)
+        used.append(tokens)
+    latencies_ms = np.array(latencies) * 1000
+    print(
+        f"{label:<6}  p50 {np.percentile(latencies_ms, 50):7.3f}ms  p95 {np.percentile(latencies_ms, 95):7.3f}ms  "
+        f"tokens used {np.mean(used):7.1f} / {max_tokens}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5, help="호출마다 넘기는 검색 결과 수")
+    parser.add_argument("--budget", type=int, default=1000, help="컨텍스트 토큰 예산")
+    args = parser.parse_args()
+
+    store = PaperVectorStore(dimension=64, embedder=LocalEmbedder(dimension=64), use_embedding_cache=False)
+    store.add_papers(make_papers(args.papers))
+    # 검색 결과처럼 저장소의 논문을 k개씩 뽑아 양쪽에 같은 순서로 넘김
+    rng = random.Random(1)
+    samples = [rng.sample(list(store.papers), args.k) for _ in range(args.calls)]
+
+    def after(papers, max_tokens):
+        context = store.get_context_within_token_limit(papers, max_tokens)
+        chosen = pack_within_budget([paper[KEY_TOKENS_FIELD] for paper in papers], max_tokens)
+        return context, sum(papers[i][KEY_TOKENS_FIELD] for i in chosen)
+
+    measure("before", lambda papers, max_tokens: context_before(store, papers, max_tokens), samples, args.budget)
+    measure("after", after, samples, args.budget)
+
+
+if __name__ == "__main__":
+    main()
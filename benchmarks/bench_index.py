@@ -0,0 +1,79 @@
+"""
+인덱스 백엔드(flat / hnsw / ivf)의 재현율과 검색 지연 시간을 비교합니다.
+
+실행 예시 (저장소 루트에서):
+    python -m benchmarks.bench_index --sizes 10000 100000 1000000 --dim 256
+
+1M개 x 1536차원은 메모리를 6GB 이상 사용하므로 기본 차원은 256으로 둡니다.
+"""
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from backend.vector_store import INDEX_BACKENDS, build_index
+
+
+def make_corpus(n: int, dim: int, n_clusters: int = 100, seed: int = 0) -> np.ndarray:
+    """클러스터 구조를 가진 단위 벡터를 만듭니다 (실제 임베딩과 비슷한 분포)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype('float32')
+    vectors = np.empty((n, dim), dtype='float32')
+    for start in range(0, n, 100_000):
+        end = min(n, start + 100_000)
+        labels = rng.integers(0, n_clusters, end - start)
+        vectors[start:end] = centers[labels] + 0.8 * rng.standard_normal((end - start, dim)).astype('float32')
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def run(size: int, dim: int, n_queries: int, k: int):
+    corpus = make_corpus(size, dim)
+    queries = make_corpus(n_queries, dim, seed=1)
+    ids = np.arange(size, dtype='int64')
+
+    ground_truth = None
+    for backend in INDEX_BACKENDS:
+        start = time.perf_counter()
+        # IVF 학습은 최대 10만 개 샘플로 제한
+        index = build_index(backend, dim, train_vectors=corpus[:100_000] if backend == "ivf" else None)
+        index.add_with_ids(corpus, ids)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        results = np.empty((n_queries, k), dtype='int64')
+        for i in range(n_queries):
+            start = time.perf_counter()
+            _, found = index.search(queries[i:i + 1], k)
+            latencies.append(time.perf_counter() - start)
+            results[i] = found[0]
+
+        if ground_truth is None:
+            ground_truth = results
+        recall = np.mean([
+            len(set(results[i]) & set(ground_truth[i])) / k for i in range(n_queries)
+        ])
+        latencies_ms = np.array(latencies) * 1000
+        print(
+            f"{size:>9,d}  {backend:<5}  build {build_seconds:8.2f}s  "
+            f"p50 {np.percentile(latencies_ms, 50):7.3f}ms  p95 {np.percentile(latencies_ms, 95):7.3f}ms  "
+            f"recall@{k} {recall:.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    # recall은 flat(전수 탐색) 결과를 기준으로 계산
+    for size in args.sizes:
+        run(size, args.dim, args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+벡터 저장소 메타데이터 형식별 저장/로드 시간과 디스크 사용량을 비교합니다.
+
+legacy: 예전 save처럼 들여쓰기한 JSON 배열 하나 (.json)
+json:   한 줄에 논문 하나인 JSON 배열 + 줄별 위치 (.json + .offsets)
+binary: 필드 표와 오프셋 표를 가진 바이너리 레코드, 초록은 zlib 압축 (.papers)
+
+로드는 전체 읽기, 메모리 맵 후 전체 순회, 제목/링크만 읽기(fields)를 각각 잽니다.
+
+실행 예시 (저장소 루트에서):
+    python -m benchmarks.bench_metadata --papers 1000 10000 100000
+
+임시 디렉터리에 저장하므로 실제 vectorstore/는 건드리지 않습니다.
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import tempfile
+import time
+
+from backend.embeddings import LocalEmbedder
+from backend.vector_store import PaperVectorStore
+
+# 검색 결과 목록처럼 초록 없이 보여줄 때 필요한 필드
+LIGHT_FIELDS = ("title", "link")
+WORDS = "이어폰 줄꼬임 현상 분석 연구 실험 결과 모델 제안 방법 데이터 성능 평가 시스템 사용자 효과".split()
+
+
+def make_papers(n: int, seed: int = 0):
+    """실제 DBpia 결과와 비슷한 길이의 가짜 논문 메타데이터를 만듭니다."""
+    rng = random.Random(seed)
+    return [
+        {
+            "title": f"{' '.join(rng.choices(WORDS, k=6))} {i}",
+            "link": f"https://www.dbpia.co.kr/journal/articleDetail?nodeId=NODE{i:08d}",
+            "abstract": " ".join(rng.choices(WORDS, k=rng.randint(80, 200))),
+        }
+        for i in range(n)
+    ]
+
+
+def make_store(papers) -> PaperVectorStore:
+    # 메타데이터 형식만 비교하므로 인덱스는 비워 둠
+    store = PaperVectorStore(dimension=8, embedder=LocalEmbedder(dimension=8), use_embedding_cache=False)
+    store.papers = papers
+    return store
+
+
+def save_legacy(store: PaperVectorStore, path: str):
+    """예전 save의 메타데이터 저장 방식."""
+    store.save(path, metadata_format="json")
+    os.remove(f"{path}.offsets")
+    with open(f"{path}.json", 'w', encoding='utf-8') as f:
+        json.dump(list(store.papers), f, ensure_ascii=False, indent=2)
+
+
+def metadata_bytes(path: str) -> int:
+    return sum(os.path.getsize(file) for file in glob.glob(f"{path}.*") if not file.endswith(".index"))
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(n: int, workdir: str):
+    papers = make_papers(n)
+    store = make_store(papers)
+    savers = {
+        "legacy": lambda path: save_legacy(store, path),
+        "json": lambda path: store.save(path, metadata_format="json"),
+        "binary": lambda path: store.save(path, metadata_format="binary"),
+    }
+    for name, save in savers.items():
+        path = os.path.join(workdir, f"{name}_{n}")
+        save_ms = timed(lambda: save(path))
+        load_ms = timed(lambda: PaperVectorStore.load(path, embedder=LocalEmbedder(dimension=8)))
+        mmap_ms = timed(lambda: list(PaperVectorStore.load(path, use_mmap=True, embedder=LocalEmbedder(dimension=8)).papers))
+        fields_ms = timed(lambda: list(PaperVectorStore.load(
+            path, use_mmap=True, fields=LIGHT_FIELDS, embedder=LocalEmbedder(dimension=8)
+        ).papers))
+        print(
+            f"{n:>8,d}  {name:<6}  {metadata_bytes(path) / 1024 / 1024:8.2f}MB  save {save_ms:8.1f}ms  "
+            f"load {load_ms:8.1f}ms  mmap {mmap_ms:8.1f}ms  {'/'.join(LIGHT_FIELDS)} {fields_ms:8.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.papers:
+            run(n, workdir)
+
+
+if __name__ == "__main__":
+    main()
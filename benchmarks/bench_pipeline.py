@@ -0,0 +1,124 @@
+"""
+로컬 가짜 서버(OpenAI, DBpia, GIPHY)로 검색부터 논문 생성, 리액션까지 전체 파이프라인을 돌려
+단계별 p50/p95/p99 지연 시간과 처리량을 잽니다. 네트워크가 없어도 실행됩니다.
+
+단계:
+    search:   search_papers_by_keywords (키워드 추출 + DBpia 검색 + 상세 페이지)
+    index:    PaperVectorStore.add_papers (문장 분리 + 임베딩 + 색인)
+    generate: stream_fake_paper (유사 논문 검색 + 컨텍스트 구성 + 스트리밍 생성, 앱과 같은 경로)
+    reaction: generate_reaction_with_gif (리액션 + GIF)
+
+실행 예시 (저장소 루트에서):
+    python -m benchmarks.bench_pipeline --iterations 50 --concurrency 4 --openai-latency-ms 300 --dbpia-latency-ms 100
+
+반복마다 검색어를 바꾸므로 키워드, HTTP, 임베딩 캐시는 모두 빗나갑니다(콜드 경로).
+가짜 키워드에도 검색어의 반복 번호가 들어가므로 매번 새 논문을 검색하고 색인합니다.
+임시 디렉터리에서 실행하므로 실제 cache/와 vectorstore/는 건드리지 않습니다.
+tiktoken 인코딩 파일은 로컬 캐시에 있어야 합니다 (없으면 처음 한 번 내려받음).
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend import dbpia_handler, reaction_utils
+from backend.backend_utils import search_papers_by_keywords
+from backend.openai_fakegen import stream_fake_paper
+from backend.tracing import format_summary, get_recorder, summarize
+from backend.vector_store import PaperVectorStore
+from benchmarks.fake_services import FakeServices
+
+STAGES = ("search", "index", "generate", "reaction", "total")
+
+
+def run_pipeline(store: PaperVectorStore, query: str, max_tokens: int):
+    """파이프라인을 한 번 실행하고 단계별 소요 시간(초)을 반환합니다."""
+    timings = {}
+    start = time.perf_counter()
+
+    stage_start = time.perf_counter()
+    result = search_papers_by_keywords(query, api_key="bench")
+    timings["search"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    store.add_papers(result["papers"])
+    timings["index"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    paper = None
+    for event in stream_fake_paper(store, query, max_tokens=max_tokens):
+        if event["type"] == "done":
+            paper = event["paper"]
+    timings["generate"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    reaction_utils.generate_reaction_with_gif(paper["title"], paper["abstract"])
+    timings["reaction"] = time.perf_counter() - stage_start
+
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+
+def report(results, wall_seconds: float):
+    print(f"{len(results)} pipelines in {wall_seconds:.2f}s  throughput {len(results) / wall_seconds:.2f}/s")
+    for stage in STAGES:
+        latencies_ms = np.array([timings[stage] for timings in results]) * 1000
+        print(
+            f"{stage:<9} p50 {np.percentile(latencies_ms, 50):9.1f}ms  p95 {np.percentile(latencies_ms, 95):9.1f}ms  "
+            f"p99 {np.percentile(latencies_ms, 99):9.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 실행할 파이프라인 수")
+    parser.add_argument("--query", default="이어폰 줄꼬임 현상의 심리학적 원인 분석")
+    parser.add_argument("--max-tokens", type=int, default=2048)
+    parser.add_argument("--openai-latency-ms", type=float, default=0.0)
+    parser.add_argument("--dbpia-latency-ms", type=float, default=0.0)
+    parser.add_argument("--giphy-latency-ms", type=float, default=0.0)
+    parser.add_argument("--stages", action="store_true", help="추적 스팬 기준 내부 단계 요약도 출력")
+    args = parser.parse_args()
+
+    latency_ms = {"openai": args.openai_latency_ms, "dbpia": args.dbpia_latency_ms, "giphy": args.giphy_latency_ms}
+    with FakeServices(latency_ms=latency_ms) as services, tempfile.TemporaryDirectory() as workdir:
+        # 클라이언트는 처음 쓸 때 만들어지므로 그 전에 주소를 가짜 서버로 돌림
+        os.environ["OPENAI_BASE_URL"] = services.openai_base_url
+        os.environ["OPENAI_API_KEY"] = "sk-bench"
+        os.environ["EMBEDDING_BACKEND"] = "openai"
+        dbpia_handler.SEARCH_URL = services.dbpia_search_url
+        reaction_utils.GIPHY_SEARCH_URL = services.giphy_search_url
+
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            store = PaperVectorStore()
+            queries = [f"{args.query} {i}" for i in range(args.iterations)]
+            # 백엔드의 진행 로그는 숨김
+            with contextlib.redirect_stdout(io.StringIO()):
+                # 첫 호출(클라이언트, 인코딩 로드 등)은 측정에서 제외
+                run_pipeline(store, f"{args.query} warmup", args.max_tokens)
+                warmup_spans = len(get_recorder().recent())
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+                    results = list(executor.map(lambda query: run_pipeline(store, query, args.max_tokens), queries))
+                wall_seconds = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+        report(results, wall_seconds)
+        print(f"indexed papers: {store.index.ntotal}")
+        print(f"requests (warmup 포함): {dict(services.requests)}")
+        if args.stages:
+            print()
+            print(format_summary(summarize(get_recorder().recent()[warmup_spans:])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Streamlit 리런마다 반복되던 자원 생성 비용을 공유 자원 재사용과 비교합니다.
+
+before: 예전 mainApp처럼 리런마다 PaperVectorStore()를 만들고(OpenAI 클라이언트, tiktoken 인코딩,
+        빈 FAISS 인덱스), vectorstore/ 디렉터리를 훑고, 백엔드 함수마다 OpenAI()를 새로 만듭니다.
+after:  프로세스 공유 자원(get_global_store, get_openai_client, get_encoding)을 가져오기만 합니다.
+
+실행 예시 (저장소 루트에서):
+    python -m benchmarks.bench_rerun --reruns 200 --legacy-stores 500
+
+임시 디렉터리에서 실행하므로 실제 vectorstore/는 건드리지 않습니다.
+tiktoken 인코딩 파일이 로컬 캐시에 없으면 처음 한 번 내려받습니다.
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+import tiktoken
+from openai import OpenAI
+
+from backend.embeddings import EMBEDDING_MODEL, LocalEmbedder
+from backend.resources import get_encoding, get_openai_client
+from backend.vector_store import LEGACY_STORE_PREFIX, VECTORSTORE_DIR, PaperVectorStore, get_global_store
+
+# 한 번의 검색 리런에서 OpenAI 클라이언트를 만들던 백엔드 함수 수 (키워드, 생성, 리액션)
+CLIENTS_PER_RERUN = 3
+
+
+def make_legacy_stores(count: int):
+    """정리 대상이 아닌(최근에 만든) 예전 방식 저장소 파일을 만듭니다."""
+    os.makedirs(VECTORSTORE_DIR, exist_ok=True)
+    for i in range(count):
+        for suffix in (".index", ".json"):
+            with open(os.path.join(VECTORSTORE_DIR, f"{LEGACY_STORE_PREFIX}{i}{suffix}"), "wb") as f:
+                f.write(b"0")
+
+
+def cleanup_old_stores(max_age_hours: int = 24):
+    """예전 mainApp이 리런마다 하던 디렉터리 정리 (지금은 백그라운드 StoreJanitor가 대신함)."""
+    for file in glob.glob(os.path.join(VECTORSTORE_DIR, f"{LEGACY_STORE_PREFIX}*")):
+        if time.time() - os.path.getmtime(file) > max_age_hours * 3600:
+            os.remove(file)
+
+
+def rerun_before():
+    store = PaperVectorStore(embedder=LocalEmbedder())
+    tiktoken.encoding_for_model(EMBEDDING_MODEL)
+    cleanup_old_stores(max_age_hours=24)
+    for _ in range(CLIENTS_PER_RERUN):
+        OpenAI()
+    return store
+
+
+def rerun_after():
+    store = get_global_store()
+    for _ in range(CLIENTS_PER_RERUN):
+        get_openai_client()
+    get_encoding(EMBEDDING_MODEL)
+    return store
+
+
+def measure(label: str, fn, reruns: int):
+    latencies = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    latencies_ms = np.array(latencies) * 1000
+    print(
+        f"{label:<7} mean {latencies_ms.mean():8.3f}ms  p50 {np.percentile(latencies_ms, 50):8.3f}ms  "
+        f"p95 {np.percentile(latencies_ms, 95):8.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=200)
+    parser.add_argument("--legacy-stores", type=int, default=500, help="vectorstore/에 둘 예전 저장소 수")
+    args = parser.parse_args()
+
+    # 실제 API 호출은 하지 않으므로 키가 없어도 클라이언트만 만들 수 있게 함
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            make_legacy_stores(args.legacy_stores)
+            # 첫 호출(인코딩 로드 등)은 양쪽 모두 측정에서 제외
+            rerun_before()
+            rerun_after()
+            measure("before", rerun_before, args.reruns)
+            measure("after", rerun_after, args.reruns)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+PaperSectionParser의 파싱 속도를 재고, 기록된 모델 출력으로 조각 분할 퍼징을 수행합니다.
+
+실행 예시 (저장소 루트에서):
+    python -m benchmarks.bench_section_parser --fuzz-rounds 500
+
+퍼징은 같은 출력을 임의의 위치에서 잘라 스트리밍처럼 넣었을 때
+한 번에 넣은 결과와 섹션/이벤트가 완전히 같은지 확인합니다.
+문단이 여러 개인 섹션은 파싱한 뒤에도 문단 사이의 빈 줄이 남아 있는지 확인합니다.
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+from backend.openai_fakegen import SECTION_HEADINGS, PaperSectionParser
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def parse_in_chunks(text: str, cut_points):
+    """cut_points 위치에서 잘라 파서에 넣고 (이벤트, 결과)를 반환합니다."""
+    parser = PaperSectionParser()
+    events = []
+    previous = 0
+    for cut in list(cut_points) + [len(text)]:
+        events.extend(parser.feed(text[previous:cut]))
+        previous = cut
+    events.extend(parser.close())
+    return events, parser.result()
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    """모델 출력에서 흔한 변형(CRLF, 여분의 빈 줄, 앞뒤 공백)을 섞습니다."""
+    lines = text.split('\n')
+    mutated = []
+    for line in lines:
+        roll = rng.random()
+        if roll < 0.1:
+            mutated.extend([line, ''])
+        elif roll < 0.2:
+            mutated.append(f"  {line}  ")
+        else:
+            mutated.append(line)
+    separator = '\r\n' if rng.random() < 0.3 else '\n'
+    return separator.join(mutated)
+
+
+def check_paragraph_breaks(text: str):
+    """
+    원문에서 빈 줄로 나뉜 문단이 파싱 결과에도 빈 줄로 남아 있는지 확인합니다.
+
+    Returns:
+        (확인한 섹션 수, 문단 구분이 사라진 섹션 이름 목록)
+    """
+    _, sections = parse_in_chunks(text, [])
+    checked = 0
+    broken = []
+    for block in text.split('\n## ')[1:]:
+        heading, _, body = block.partition('\n')
+        paragraphs = [paragraph for paragraph in body.split('\n\n') if paragraph.strip()]
+        name = next((name for prefixes, name in SECTION_HEADINGS if f"## {heading}".startswith(prefixes)), None)
+        if name is None or len(paragraphs) < 2:
+            continue
+        checked += 1
+        if sections[name].count('\n\n') != len(paragraphs) - 1:
+            broken.append(name)
+    return checked, broken
+
+
+def bench(text: str, chunk_size: int, rounds: int) -> float:
+    cuts = list(range(chunk_size, len(text), chunk_size)) if chunk_size else []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse_in_chunks(text, cuts)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def fuzz(text: str, rounds: int, rng: random.Random) -> int:
+    failures = 0
+    for _ in range(rounds):
+        sample = mutate(text, rng)
+        expected = parse_in_chunks(sample, [])
+        cuts = sorted(rng.sample(range(1, len(sample)), rng.randint(1, min(200, len(sample) - 1))))
+        if parse_in_chunks(sample, cuts) != expected:
+            failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--fuzz-rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    paragraph_sections = 0
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "recorded_paper_*.md"))):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        name = os.path.basename(path)
+        for chunk_size in (0, 64, 8, 1):
+            label = "whole" if chunk_size == 0 else f"{chunk_size}-char"
+            print(f"{name}  {label:<7}  {bench(text, chunk_size, args.rounds):9.1f} µs/doc")
+        file_failures = fuzz(text, args.fuzz_rounds, rng)
+        print(f"{name}  fuzz     {args.fuzz_rounds - file_failures}/{args.fuzz_rounds} chunkings matched")
+        failures += file_failures
+        checked, broken = check_paragraph_breaks(text)
+        print(f"{name}  paragraphs  {checked - len(broken)}/{checked} multi-paragraph sections kept their blank lines")
+        paragraph_sections += checked
+        failures += len(broken)
+
+    # 기록된 출력에 문단이 여러 개인 섹션이 없으면 문단 구분 확인이 아무것도 검사하지 않음
+    assert paragraph_sections, "recorded outputs have no multi-paragraph section"
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+네트워크 없이 파이프라인을 돌리기 위한 로컬 가짜 서버입니다.
+
+한 HTTP 서버가 경로별로 다음을 흉내냅니다.
+    /v1/chat/completions, /v1/embeddings: OpenAI 호환 API (스트리밍, usage, base64 임베딩 포함)
+    /dbpia/search.xml, /dbpia/detail/<id>: DBpia 검색 API와 상세 페이지
+    /giphy/search: GIPHY 검색 API
+
+응답은 요청 내용으로 결정되므로(같은 입력이면 같은 출력) 실행마다 결과가 같습니다.
+키워드는 연구 주제 전체(끝의 번호까지)에서 뽑으므로 주제가 다르면 DBpia 검색도 달라지고,
+그 키워드로 찾은 논문의 초록은 원래 연구 주제를 다룹니다. 임베딩은 LocalEmbedder로 만들어
+비슷한 텍스트끼리 비슷하므로, 생성 단계의 유사 논문 검색이 실제처럼 결과를 돌려줍니다.
+서비스별 지연 시간은 FakeServices(latency_ms={...})로 정합니다.
+
+    with FakeServices(latency_ms={"openai": 200}) as services:
+        os.environ["OPENAI_BASE_URL"] = services.openai_base_url
+"""
+import base64
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from backend.embeddings import LocalEmbedder
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_LATENCY_MS = {"openai": 0.0, "dbpia": 0.0, "giphy": 0.0}
+# 상세 페이지 중 이 간격마다 초록이 없는 페이지를 돌려줌
+MISSING_ABSTRACT_EVERY = 4
+WORDS = "이어폰 줄꼬임 현상 분석 연구 실험 결과 모델 제안 방법 데이터 성능 평가 시스템 사용자 효과 심리 원인".split()
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+
+
+def _words(seed_text: str, count: int) -> str:
+    rng = np.random.default_rng(_seed(seed_text))
+    return " ".join(WORDS[i] for i in rng.integers(0, len(WORDS), count))
+
+
+def _count_tokens(text: str) -> int:
+    # 한국어는 대략 두 글자에 한 토큰
+    return max(1, len(text) // 2)
+
+
+def load_recorded_paper() -> str:
+    """benchmarks/data에 기록해 둔 모델 출력(논문)을 읽습니다."""
+    paths = sorted(glob.glob(os.path.join(DATA_DIR, "recorded_paper_*.md")))
+    with open(paths[0], "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    services: "FakeServices"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload):
+        self._send(200, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/dbpia/search.xml":
+            self.services.wait("dbpia", url.path)
+            self._send(200, self.services.search_xml(params.get("searchall", ""), int(params.get("pagecount", 20))), "application/xml")
+        elif url.path.startswith("/dbpia/detail/"):
+            self.services.wait("dbpia", "/dbpia/detail")
+            self._send(200, self.services.detail_html(url.path.rsplit("/", 1)[-1]), "text/html; charset=utf-8")
+        elif url.path == "/giphy/search":
+            self.services.wait("giphy", url.path)
+            self._send_json(self.services.giphy_search(params.get("q", ""), int(params.get("limit", 25))))
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        request = self._read_json()
+        if url.path == "/v1/embeddings":
+            self.services.wait("openai", url.path)
+            self._send_json(self.services.embeddings(request))
+        elif url.path == "/v1/chat/completions":
+            self.services.wait("openai", url.path)
+            if request.get("stream"):
+                self._stream_chat(request)
+            else:
+                self._send_json(self.services.chat_completion(request))
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _stream_chat(self, request):
+        """Server-Sent Events로 응답을 조각내어 보냅니다."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for chunk in self.services.chat_chunks(request):
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeServices:
+    """OpenAI, DBpia, GIPHY를 흉내내는 로컬 HTTP 서버입니다. with 블록 안에서만 실행됩니다."""
+
+    def __init__(
+        self,
+        latency_ms: Optional[Dict[str, float]] = None,
+        stream_chunk_ms: float = 0.0,
+        embedding_dimension: int = 1536,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        Args:
+            latency_ms: 서비스별('openai', 'dbpia', 'giphy') 요청당 지연 시간(ms)
+            stream_chunk_ms: 스트리밍 응답 조각 사이의 지연 시간(ms)
+            embedding_dimension: 임베딩 차원
+            host, port: 서버 주소 (port=0이면 빈 포트를 고름)
+        """
+        self.latency_ms = {**DEFAULT_LATENCY_MS, **(latency_ms or {})}
+        self.stream_chunk_ms = stream_chunk_ms
+        self.embedding_dimension = embedding_dimension
+        self.paper_text = load_recorded_paper()
+        self.requests: Counter = Counter()
+        self._embedder = LocalEmbedder(dimension=embedding_dimension)
+        # 키워드 -> 그 키워드를 뽑은 연구 주제, 상세 페이지 id -> 연구 주제 (초록 내용에 씀)
+        self._keyword_topics: Dict[str, str] = {}
+        self._node_topics: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        handler = type("Handler", (_Handler,), {"services": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    @property
+    def dbpia_search_url(self) -> str:
+        return f"{self.base_url}/dbpia/search.xml"
+
+    @property
+    def giphy_search_url(self) -> str:
+        return f"{self.base_url}/giphy/search"
+
+    def __enter__(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def wait(self, service: str, endpoint: str):
+        """요청 수를 세고 서비스의 지연 시간만큼 기다립니다."""
+        with self._lock:
+            self.requests[endpoint] += 1
+        if self.latency_ms[service]:
+            time.sleep(self.latency_ms[service] / 1000)
+
+    # DBpia
+
+    def search_xml(self, query: str, page_count: int) -> bytes:
+        items = []
+        with self._lock:
+            topic = self._keyword_topics.get(query, query)
+        for position in range(page_count):
+            node = hashlib.sha1(f"{query}:{position}".encode("utf-8")).hexdigest()[:12]
+            with self._lock:
+                self._node_topics[node] = topic
+            # 무료이거나 미리보기가 있어야 상세 페이지를 요청함
+            free = position % 2 == 0
+            items.append(
+                "<item>"
+                # 실제 API처럼 검색어를 하이라이트 태그로 감쌈
+                f"<title>{escape(f'{_words(node, 6)} <!HS>{query}<!HE> {position}')}</title>"
+                f"<link_url>{self.base_url}/dbpia/detail/{node}</link_url>"
+                f"<free_yn>{'Y' if free else 'N'}</free_yn>"
+                f"<preview_yn>{'N' if free else 'Y'}</preview_yn>"
+                f"<preview>{self.base_url}/dbpia/preview/{node}</preview>"
+                "</item>"
+            )
+        return f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><root><result><items>{''.join(items)}</items></result></root>".encode("utf-8")
+
+    def detail_html(self, node: str) -> bytes:
+        if _seed(node) % MISSING_ABSTRACT_EVERY == 0:
+            abstract = "등록된 정보가 없습니다."
+        else:
+            with self._lock:
+                topic = self._node_topics.get(node, "")
+            abstract = ". ".join(f"{topic} {_words(f'{node}:{i}', 6)}".strip() for i in range(6)) + "."
+        return (
+            "<html><body><div class=\"articleInfo\">상세 정보</div>"
+            f"<div class=\"abstractTxt\">{escape(abstract)}</div></body></html>"
+        ).encode("utf-8")
+
+    # GIPHY
+
+    def giphy_search(self, query: str, limit: int) -> dict:
+        return {"data": [
+            {"images": {"original": {"url": f"{self.base_url}/giphy/media/{query}/{i}.gif"}}}
+            for i in range(limit)
+        ]}
+
+    # OpenAI
+
+    def embeddings(self, request: dict) -> dict:
+        texts = request["input"]
+        if isinstance(texts, str):
+            texts = [texts]
+        data = []
+        for i, vector in enumerate(self._embedder.embed(texts)):
+            if request.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(_count_tokens(text) for text in texts)
+        return {
+            "object": "list",
+            "data": data,
+            "model": request.get("model"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def _chat_content(self, request: dict) -> str:
+        """시스템 프롬프트로 어떤 호출(키워드, 리액션, 논문 생성)인지 구분해 답합니다."""
+        system = next((m["content"] for m in request["messages"] if m["role"] == "system"), "")
+        user = next((m["content"] for m in request["messages"] if m["role"] == "user"), "")
+        if "keywords" in system:
+            topic = user.rsplit("연구 주제:", 1)[-1].strip()
+            words = topic.split()
+            # 앞 세 단어에 주제의 마지막 단어(벤치마크의 반복 번호 등)를 붙여 주제마다 다른 키워드가 나오게 함
+            suffix = f" {words[-1]}" if len(words) > 3 else ""
+            keywords = [f"{word}{suffix}" for word in words[:3]]
+            with self._lock:
+                self._keyword_topics.update((keyword, topic) for keyword in keywords)
+            return ", ".join(keywords)
+        if "reaction" in system:
+            return "\"이런 연구를 하다니 당신은 천재인가요?\""
+        return self.paper_text
+
+    def _usage(self, request: dict, content: str) -> dict:
+        prompt_tokens = sum(_count_tokens(m["content"]) for m in request["messages"])
+        completion_tokens = _count_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def chat_completion(self, request: dict) -> dict:
+        content = self._chat_content(request)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": self._usage(request, content),
+        }
+
+    def chat_chunks(self, request: dict, chunk_chars: int = 16):
+        content = self._chat_content(request)
+        base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": request.get("model")}
+        for start in range(0, len(content), chunk_chars):
+            if self.stream_chunk_ms and start:
+                time.sleep(self.stream_chunk_ms / 1000)
+            yield {**base, "choices": [{"index": 0, "delta": {"content": content[start:start + chunk_chars]}, "finish_reason": None}]}
+        yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
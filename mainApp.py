@@ -6,57 +6,68 @@ import uuid
 import json
 from datetime import datetime
 from dotenv import load_dotenv
-from openai import OpenAI
-from backend.backend_utils import search_papers_by_keywords
-from backend.openai_fakegen import generate_fake_paper
-from backend.vector_store import PaperVectorStore
-from backend.reaction_utils import generate_reaction, get_reaction_gif
+from backend.backend_utils import extract_keywords_with_openai, iter_papers_by_keywords
+from backend.openai_fakegen import GENERATION_MODEL, stream_fake_paper
+from backend.vector_store import GLOBAL_STORE_PATH, get_global_store
+from backend.paper_store import get_paper_store
+from backend.store_janitor import get_store_janitor
+from backend.reaction_utils import generate_reaction_with_gif, get_gif_pool, submit_reaction
+from backend.tracing import span
 
 # Load environment variables
 load_dotenv()
 DBPIA_API_KEY = os.getenv("DBPIA_API_KEY")
 
 # Constants
-PAPERS_STORAGE_FILE = "generated_papers.json"
+PAPERS_DB_FILE = "generated_papers.db"
+PAPERS_STORAGE_FILE = "generated_papers.json"  # 예전 형식. 처음 실행 시 PAPERS_DB_FILE로 옮겨짐
 KEYWORDS_STORAGE_FILE = "search_keywords.json"
 
+# 프로세스당 한 번만 만드는 공유 자원 (리런마다 다시 만들지 않음)
+@st.cache_resource
+def load_paper_store():
+    return get_paper_store(PAPERS_DB_FILE, PAPERS_STORAGE_FILE)
+
+@st.cache_resource
+def load_vector_store():
+    # 오래된 저장소 정리는 백그라운드 스레드가 맡음 (페이지 로드 때는 디렉터리를 훑지 않음)
+    get_store_janitor()
+    return get_global_store()
+
+@st.cache_resource
+def load_gif_pool():
+    # 첫 리액션을 기다리지 않고 앱 시작 때 풀을 읽고 백그라운드 갱신을 시작
+    return get_gif_pool()
+
 # Initialize storage
 def init_storage():
-    if not os.path.exists(PAPERS_STORAGE_FILE):
-        with open(PAPERS_STORAGE_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f, ensure_ascii=False)
-    
     if not os.path.exists(KEYWORDS_STORAGE_FILE):
         with open(KEYWORDS_STORAGE_FILE, "w", encoding="utf-8") as f:
             json.dump([], f, ensure_ascii=False)
 
-def save_generated_paper(paper_data, search_query):
-    try:
-        with open(PAPERS_STORAGE_FILE, "r", encoding="utf-8") as f:
-            papers = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        papers = []
-    
-    # Add metadata to paper
-    paper_data["generated_at"] = datetime.now().isoformat()
-    paper_data["search_query"] = search_query
-    paper_data["paper_id"] = str(uuid.uuid4())
-    
-    # Add to papers list
-    papers.append(paper_data)
-    
-    # Save back to file
-    with open(PAPERS_STORAGE_FILE, "w", encoding="utf-8") as f:
-        json.dump(papers, f, ensure_ascii=False, indent=2)
-    
-    return paper_data["paper_id"]
+def save_generated_paper(paper_data, search_query, reaction=None, reaction_gif=None):
+    # 리액션은 논문과 함께 저장해 두고 다시 생성하지 않음
+    return load_paper_store().add_paper(
+        paper_data, search_query, reaction=reaction, reaction_gif=reaction_gif
+    )
 
-def load_generated_papers():
-    try:
-        with open(PAPERS_STORAGE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+def update_paper_reaction(paper_id, reaction, reaction_gif):
+    load_paper_store().update_reaction(paper_id, reaction, reaction_gif)
+
+def remember_generated_paper(generation_key, generated):
+    """생성한 논문을 세션에 기억합니다. GENERATED_PAPER_CACHE_SIZE를 넘으면 가장 오래된 것부터 잊습니다."""
+    generated_papers = st.session_state.generated_papers
+    generated_papers.pop(generation_key, None)
+    generated_papers[generation_key] = generated
+    while len(generated_papers) > GENERATED_PAPER_CACHE_SIZE:
+        generated_papers.pop(next(iter(generated_papers)))
+
+def go_to_next_archive_page(cursor):
+    st.session_state.archive_cursors.append(cursor)
+
+def go_to_previous_archive_page():
+    if len(st.session_state.archive_cursors) > 1:
+        st.session_state.archive_cursors.pop()
 
 def save_search_keyword(keyword):
     try:
@@ -122,10 +133,151 @@ if 'vector_store' not in st.session_state:
     st.session_state.vector_store = None
 if 'current_query' not in st.session_state:
     st.session_state.current_query = None
+# 보관함 페이지별 시작 위치 (None은 첫 페이지)
+if 'archive_cursors' not in st.session_state:
+    st.session_state.archive_cursors = [None]
+# (검색 id, 검색어, 생성 모델, 최대 토큰)별로 생성한 논문. 리런마다 다시 생성하지 않도록 보관
+if 'generated_papers' not in st.session_state:
+    st.session_state.generated_papers = {}
+
+# 전역 논문 인덱스 (프로세스당 한 번 로드)
+vector_store = load_vector_store()
+load_gif_pool()
+
+# 논문을 다 그린 뒤 리액션을 기다리는 최대 시간(초). 넘으면 리액션 없이 진행
+REACTION_WAIT_SECONDS = 5
+REACTION_FALLBACK_MESSAGE = "🤔 AI가 아직 논문을 곱씹는 중이에요... 리액션은 다음 기회에!"
+
+# 논문 생성 최대 토큰 수
+GENERATION_MAX_TOKENS = 2048
+# 세션마다 기억해 둘 생성 논문 수 (오래된 것부터 잊음)
+GENERATED_PAPER_CACHE_SIZE = 10
+
+# 보관함 한 페이지에 보여줄 논문 수
+ARCHIVE_PAGE_SIZE = 20
+# 보관함 검색 결과 최대 개수
+ARCHIVE_SEARCH_LIMIT = 50
+
+# 검색 결과를 이 개수만큼 모을 때마다 임베딩하여 인덱스에 추가
+EMBED_FLUSH_SIZE = 5
+
+# 논문 섹션별 화면 제목 (표시 순서)
+SECTION_HEADINGS = {
+    "title": "#",
+    "abstract": "## 초록",
+    "introduction": "## 1. 서론",
+    "background": "## 2. 이론적 배경",
+    "method": "## 3. 연구 방법",
+    "results": "## 4. 연구 결과",
+    "conclusion": "## 5. 결론",
+    "references": "## 참고문헌"
+}
+
+def render_paper_section(placeholder, section, text):
+    """논문 섹션 하나를 자리(placeholder)에 그립니다."""
+    if section == "title":
+        placeholder.markdown(f"# {text}")
+    elif section == "references":
+        references = "\n".join(f"- {ref}" for ref in text.split('\n') if ref.strip())
+        placeholder.markdown(f"{SECTION_HEADINGS[section]}\n\n{references}")
+    else:
+        placeholder.markdown(f"{SECTION_HEADINGS[section]}\n\n{text}")
+
+def render_loading(placeholder, title, progress=None):
+    """로딩 상자를 자리(placeholder)에 그립니다. progress에는 지금 진행 중인 단계를 적습니다."""
+    progress_html = f"<p>{progress}</p>" if progress else ""
+    placeholder.markdown(f"""
+    <div class="loading-container">
+        <h3>{title}</h3>
+        {progress_html}
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_reaction(placeholder, reaction, gif_url):
+    """AI 리액션 상자를 자리(placeholder)에 그립니다."""
+    placeholder.markdown("""
+    <div style='background-color: #f8f8f8; padding: 2rem; border-radius: 8px; margin: 2rem 0; text-align: center; border: 1px solid #FFD700;'>
+        <h3 style='margin-bottom: 1rem; color: #333;'>🤖 AI의 리액션</h3>
+        <p style='font-size: 1.2rem; margin-bottom: 1.5rem; color: #666;'>{}</p>
+        {}
+    </div>
+    """.format(
+        reaction,
+        f'<img src="{gif_url}" style="max-width: 300px; border-radius: 8px; margin: 0 auto; display: block;" alt="Reaction GIF">' if gif_url else ''
+    ), unsafe_allow_html=True)
+
+def render_archived_paper(paper):
+    """보관함 논문 한 편의 본문, 리액션, 다운로드 버튼을 그립니다."""
+    st.markdown(f"**검색어:** {paper['search_query']}")
+    
+    # Paper content tabs
+    paper_tabs = st.tabs(["초록", "본문", "AI 리액션"])
+    
+    with paper_tabs[0]:
+        st.markdown(paper["abstract"])
+    
+    with paper_tabs[1]:
+        st.markdown("### 1. 서론")
+        st.markdown(paper["introduction"])
+        st.markdown("### 2. 이론적 배경")
+        st.markdown(paper["background"])
+        st.markdown("### 3. 연구 방법")
+        st.markdown(paper["method"])
+        st.markdown("### 4. 연구 결과")
+        st.markdown(paper["results"])
+        st.markdown("### 5. 결론")
+        st.markdown(paper["conclusion"])
+        st.markdown("### 참고문헌")
+        references = paper["references"].split('\n')
+        for ref in references:
+            if ref.strip():
+                st.markdown(f"- {ref}")
+    
+    with paper_tabs[2]:
+        # 저장된 리액션을 보여주고, 없거나 새로 원할 때만 생성
+        reaction = paper.get("reaction")
+        gif_url = paper.get("reaction_gif")
+        button_label = "🔄 새 리액션 받기" if reaction else "🤖 리액션 받기"
+        if st.button(button_label, key=f"reaction_{paper['paper_id']}"):
+            with st.spinner("🤖 AI가 논문을 읽고 있습니다..."):
+                reaction, gif_url = generate_reaction_with_gif(paper["title"], paper["abstract"])
+            update_paper_reaction(paper["paper_id"], reaction, gif_url)
+        
+        st.markdown(f"### 🤖 AI의 리액션")
+        if reaction:
+            st.markdown(reaction)
+            if gif_url:
+                st.image(gif_url, width=300)
+        else:
+            st.caption("아직 리액션이 없습니다. 버튼을 눌러 받아보세요!")
+    
+    # Download button
+    paper_content = f"""제목: {paper['title']}\n\n
+[초록]\n{paper['abstract']}\n\n
+[1. 서론]\n{paper['introduction']}\n\n
+[2. 이론적 배경]\n{paper['background']}\n\n
+[3. 연구 방법]\n{paper['method']}\n\n
+[4. 연구 결과]\n{paper['results']}\n\n
+[5. 결론]\n{paper['conclusion']}\n\n
+[참고문헌]\n{paper['references']}""" 
+    
+    st.download_button(
+        label="📥 논문 다운로드",
+        data=paper_content,
+        file_name=f"generated_paper_{paper['search_query'][:30]}.txt",
+        mime="text/plain",
+        key=f"download_stored_{paper['paper_id']}"
+    )
 
-# 오래된 벡터 저장소 정리
-vector_store = PaperVectorStore()
-vector_store.cleanup_old_stores(max_age_hours=24)  # 24시간 이상 된 저장소 삭제
+def render_archive_list(paper_store, summaries):
+    """보관함 논문 제목 목록을 그립니다. 펼친 논문만 본문을 불러옵니다."""
+    for summary in summaries:
+        generated_at = datetime.fromisoformat(summary['generated_at']).strftime('%Y-%m-%d %H:%M')
+        if st.toggle(f"📄 {summary['title']} ({generated_at})", key=f"open_paper_{summary['paper_id']}"):
+            paper = paper_store.get_paper(summary['paper_id'])
+            if paper:
+                with st.container(border=True):
+                    render_archived_paper(paper)
 
 # Fun loading messages
 LOADING_MESSAGES = [
@@ -407,71 +559,75 @@ with tabs[0]:
         if search_type == "진짜같은 가짜 논문":
             # 새로운 검색어이거나 벡터 저장소가 없는 경우에만 논문 검색
             if st.session_state.current_query != search_query or st.session_state.vector_store is None:
-                # Fun loading animation with random messages
+                # 로딩 화면에 지금 진행 중인 단계를 표시
                 loading_placeholder = st.empty()
-                with loading_placeholder:
-                    st.markdown(f"""
-                    <div class="loading-container">
-                        <h3>🔍 관련 논문을 검색하고 있습니다...</h3>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_loading(loading_placeholder, "🔍 관련 논문을 검색하고 있습니다...", "🔑 검색 키워드를 추출하는 중")
+                
+                with span("paper_search") as search_span:
+                    keywords = extract_keywords_with_openai(search_query)
+                    render_loading(
+                        loading_placeholder, "🔍 관련 논문을 검색하고 있습니다...",
+                        f"🔑 키워드 {', '.join(keywords)} · 📚 DBpia 검색 중 ({search_span.elapsed_ms() / 1000:.1f}초)"
+                    )
                     
-                    # 논문 검색
-                    result = search_papers_by_keywords(search_query, DBPIA_API_KEY)
+                    # 논문 검색 (키워드별 검색 결과가 도착하는 대로 임베딩)
+                    papers = []
+                    pending = []
+                    added = 0
+                    for paper in iter_papers_by_keywords(keywords, DBPIA_API_KEY):
+                        papers.append(paper)
+                        pending.append(paper)
+                        if len(pending) >= EMBED_FLUSH_SIZE:
+                            added += vector_store.add_papers(pending)
+                            pending = []
+                        render_loading(
+                            loading_placeholder, "🔍 관련 논문을 검색하고 있습니다...",
+                            f"📄 논문 {len(papers)}편 발견 · 🧮 {added}편 임베딩 완료 ({search_span.elapsed_ms() / 1000:.1f}초)"
+                        )
+                    if pending:
+                        added += vector_store.add_papers(pending)
+                    search_span.add("papers", len(papers))
+                    search_span.add("added", added)
                     
-                    if result['papers']:
-                        # 새로운 검색 ID 생성
-                        search_id = str(uuid.uuid4())
-                        st.session_state.search_id = search_id
-                        
-                        # 벡터 저장소 경로 설정
-                        vector_store_path = f"vectorstore/paper_vectors_{search_id}"
-                        
-                        # 벡터 저장소 생성
-                        vector_store = PaperVectorStore()
-                        vector_store.add_papers(result['papers'])
-                        vector_store.save(vector_store_path)
-                        
-                        # 세션 상태 업데이트
-                        st.session_state.vector_store = vector_store
-                        st.session_state.current_query = search_query
-                        
-                        # 키워드 표시
-                        st.success(f"✅ 총 {len(result['papers'])}개의 관련 논문을 찾았습니다!")
-                        st.markdown(f"**추출된 키워드:** {', '.join(result['keywords'])}")
-                    else:
-                        st.error("❌ 관련 논문을 찾지 못했습니다.")
-                        loading_placeholder.empty()
-                        st.stop()
-            
-            # 논문 생성
-            loading_placeholder = st.empty()
-            for i in range(3):  # Show 3 different loading messages
-                with loading_placeholder:
-                    st.markdown(f"""
-                    <div class="loading-container">
-                        <h3>{random.choice(LOADING_MESSAGES)}</h3>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    time.sleep(1)
-            
-            # Generate paper using backend
-            fake_paper = generate_fake_paper(
-                vector_store=st.session_state.vector_store,
-                query=search_query,
-                max_tokens=2048
-            )
-            
-            # Clear loading animation
-            loading_placeholder.empty()
+                    # 전역 인덱스에 새 논문이 추가된 경우에만 저장
+                    if added:
+                        render_loading(loading_placeholder, "🔍 관련 논문을 검색하고 있습니다...", "💾 논문 색인을 저장하는 중")
+                        vector_store.save(GLOBAL_STORE_PATH)
+                
+                loading_placeholder.empty()
+                if papers:
+                    # 새로운 검색 ID 생성
+                    search_id = str(uuid.uuid4())
+                    st.session_state.search_id = search_id
+                    
+                    # 세션 상태 업데이트
+                    st.session_state.vector_store = vector_store
+                    st.session_state.current_query = search_query
+                    
+                    # 키워드 표시
+                    st.success(f"✅ 총 {len(papers)}개의 관련 논문을 찾았습니다!")
+                    st.markdown(f"**추출된 키워드:** {', '.join(keywords)}")
+                else:
+                    st.error("❌ 관련 논문을 찾지 못했습니다.")
+                    st.stop()
             
-            # Add fun paper header
-            journal_style = random.choice(PAPER_STYLES)
-            current_date = time.strftime("%Y년 %m월 %d일")
+            # 같은 검색에서 이미 만든 논문은 리런(키워드 버튼, 다운로드 등)마다 다시 생성하지 않음
+            generation_key = (st.session_state.search_id, search_query, GENERATION_MODEL, GENERATION_MAX_TOKENS)
+            if st.button("🔄 새 논문 생성", key="regenerate_paper"):
+                st.session_state.generated_papers.pop(generation_key, None)
+            generated = st.session_state.generated_papers.get(generation_key)
             
-            # 리액션 생성 및 GIF 가져오기
-            reaction = generate_reaction(fake_paper['title'], fake_paper['abstract'])
-            gif_url = get_reaction_gif(reaction)
+            if generated is None:
+                # 논문 생성 (스트리밍): 첫 내용이 도착할 때까지만 로딩 메시지 표시
+                loading_placeholder = st.empty()
+                render_loading(loading_placeholder, random.choice(LOADING_MESSAGES), "🧠 비슷한 논문을 찾아 문맥을 구성하는 중")
+                
+                # Add fun paper header
+                journal_style = random.choice(PAPER_STYLES)
+                current_date = time.strftime("%Y년 %m월 %d일")
+            else:
+                journal_style = generated["journal_style"]
+                current_date = generated["date"]
 
             # 논문 제목과 헤더
             st.markdown(f"""
@@ -483,39 +639,48 @@ with tabs[0]:
             </div>
             """, unsafe_allow_html=True)
 
-            # 논문 제목
-            st.markdown(f"# {fake_paper['title']}")
-            
-            # 초록
-            st.markdown("## 초록")
-            st.markdown(fake_paper['abstract'])
+            # 섹션별 자리를 미리 만들어 두고, 도착하는 대로 채움
+            section_placeholders = {section: st.empty() for section in SECTION_HEADINGS}
             
-            # 서론
-            st.markdown("## 1. 서론")
-            st.markdown(fake_paper['introduction'])
-            
-            # 이론적 배경
-            st.markdown("## 2. 이론적 배경")
-            st.markdown(fake_paper['background'])
-            
-            # 연구 방법
-            st.markdown("## 3. 연구 방법")
-            st.markdown(fake_paper['method'])
-            
-            # 연구 결과
-            st.markdown("## 4. 연구 결과")
-            st.markdown(fake_paper['results'])
-            
-            # 결론
-            st.markdown("## 5. 결론")
-            st.markdown(fake_paper['conclusion'])
+            if generated is None:
+                streamed_lines = {section: [] for section in SECTION_HEADINGS}
+                fake_paper = None
+                reaction_future = None
+                
+                for event in stream_fake_paper(
+                    vector_store=st.session_state.vector_store,
+                    query=search_query,
+                    max_tokens=GENERATION_MAX_TOKENS
+                ):
+                    if event["type"] == "section":
+                        loading_placeholder.empty()
+                        # 초록이 끝나면 나머지 섹션을 생성하는 동안 리액션을 미리 만들기 시작
+                        if reaction_future is None and streamed_lines["abstract"] and event["section"] != "abstract":
+                            reaction_future = submit_reaction(
+                                "\n".join(streamed_lines["title"]),
+                                "\n".join(streamed_lines["abstract"]).strip()
+                            )
+                        if event["section"] == "title":
+                            streamed_lines["title"] = [event["text"]]
+                            render_paper_section(section_placeholders["title"], "title", event["text"])
+                    elif event["type"] == "line":
+                        section = event["section"]
+                        streamed_lines[section].append(event["text"])
+                        render_paper_section(section_placeholders[section], section, "\n".join(streamed_lines[section]))
+                    elif event["type"] == "done":
+                        fake_paper = event["paper"]
+                
+                # Clear loading animation
+                loading_placeholder.empty()
+                
+                if reaction_future is None:
+                    reaction_future = submit_reaction(fake_paper['title'], fake_paper['abstract'])
+            else:
+                fake_paper = generated["paper"]
             
-            # 참고문헌
-            st.markdown("## 참고문헌")
-            references = fake_paper['references'].split('\n')
-            for ref in references:
-                if ref.strip():
-                    st.markdown(f"- {ref}")
+            # 최종 파싱 결과로 다시 그려 저장되는 내용과 화면을 일치시킴
+            for section, placeholder in section_placeholders.items():
+                render_paper_section(placeholder, section, fake_paper[section])
 
             # 스타일 적용
             st.markdown("""
@@ -556,183 +721,187 @@ with tabs[0]:
             </style>
             """, unsafe_allow_html=True)
 
-            # 리액션 섹션 (논문 내용 아래에 표시)
-            st.markdown("""
-            <div style='background-color: #f8f8f8; padding: 2rem; border-radius: 8px; margin: 2rem 0; text-align: center; border: 1px solid #FFD700;'>
-                <h3 style='margin-bottom: 1rem; color: #333;'>🤖 AI의 리액션</h3>
-                <p style='font-size: 1.2rem; margin-bottom: 1.5rem; color: #666;'>{}</p>
-                {}
-            </div>
-            """.format(
-                reaction,
-                f'<img src="{gif_url}" style="max-width: 300px; border-radius: 8px; margin: 0 auto; display: block;" alt="Reaction GIF">' if gif_url else ''
-            ), unsafe_allow_html=True)
-
-            # Save generated paper after generation
-            paper_data = {
-                "title": fake_paper["title"],
-                "abstract": fake_paper["abstract"],
-                "introduction": fake_paper["introduction"],
-                "background": fake_paper["background"],
-                "method": fake_paper["method"],
-                "results": fake_paper["results"],
-                "conclusion": fake_paper["conclusion"],
-                "references": fake_paper["references"]
-            }
-            save_generated_paper(paper_data, search_query)
-
-            # 논문 다운로드 버튼
-            filename = f"generated_paper_{search_query[:30]}.txt"
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(f"제목: {fake_paper['title']}\n\n")
-                f.write(f"[초록]\n{fake_paper['abstract']}\n\n")
-                f.write(f"[1. 서론]\n{fake_paper['introduction']}\n\n")
-                f.write(f"[2. 이론적 배경]\n{fake_paper['background']}\n\n")
-                f.write(f"[3. 연구 방법]\n{fake_paper['method']}\n\n")
-                f.write(f"[4. 연구 결과]\n{fake_paper['results']}\n\n")
-                f.write(f"[5. 결론]\n{fake_paper['conclusion']}\n\n")
-                f.write(f"[참고문헌]\n{fake_paper['references']}\n")
+            # 리액션 섹션 (논문 내용 아래에 표시). 마감 시간 안에 오지 않으면 대체 문구 표시
+            reaction_placeholder = st.empty()
+            if generated is None:
+                try:
+                    reaction, gif_url = reaction_future.result(timeout=REACTION_WAIT_SECONDS)
+                except Exception as e:
+                    print(f"리액션 생성 실패 또는 시간 초과: {e!r}")
+                    # 저장하지 않고, 내 논문 탭에서 필요할 때 생성
+                    reaction, gif_url = None, None
+            else:
+                reaction, gif_url = generated["reaction"], generated["reaction_gif"]
+            render_reaction(reaction_placeholder, reaction or REACTION_FALLBACK_MESSAGE, gif_url)
+
+            if generated is None:
+                # Save generated paper after generation
+                paper_data = {
+                    "title": fake_paper["title"],
+                    "abstract": fake_paper["abstract"],
+                    "introduction": fake_paper["introduction"],
+                    "background": fake_paper["background"],
+                    "method": fake_paper["method"],
+                    "results": fake_paper["results"],
+                    "conclusion": fake_paper["conclusion"],
+                    "references": fake_paper["references"]
+                }
+                paper_id = save_generated_paper(paper_data, search_query, reaction=reaction, reaction_gif=gif_url)
+
+                # 논문 다운로드 파일
+                filename = f"generated_paper_{search_query[:30]}.txt"
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(f"제목: {fake_paper['title']}\n\n")
+                    f.write(f"[초록]\n{fake_paper['abstract']}\n\n")
+                    f.write(f"[1. 서론]\n{fake_paper['introduction']}\n\n")
+                    f.write(f"[2. 이론적 배경]\n{fake_paper['background']}\n\n")
+                    f.write(f"[3. 연구 방법]\n{fake_paper['method']}\n\n")
+                    f.write(f"[4. 연구 결과]\n{fake_paper['results']}\n\n")
+                    f.write(f"[5. 결론]\n{fake_paper['conclusion']}\n\n")
+                    f.write(f"[참고문헌]\n{fake_paper['references']}\n")
+                with open(filename, "r", encoding="utf-8") as f:
+                    download_text = f.read()
+                
+                generated = {
+                    "paper": fake_paper,
+                    "paper_id": paper_id,
+                    "journal_style": journal_style,
+                    "date": current_date,
+                    "reaction": reaction,
+                    "reaction_gif": gif_url,
+                    "filename": filename,
+                    "download_text": download_text,
+                }
+                remember_generated_paper(generation_key, generated)
             
-            with open(filename, "r", encoding="utf-8") as f:
-                st.download_button(
-                    label="📥 논문 다운로드",
-                    data=f.read(),
-                    file_name=filename,
-                    mime="text/plain",
-                    key=f"download_new_{str(uuid.uuid4())}"
-                )
+            # 논문 다운로드 버튼
+            st.download_button(
+                label="📥 논문 다운로드",
+                data=generated["download_text"],
+                file_name=generated["filename"],
+                mime="text/plain",
+                key=f"download_new_{generated['paper_id']}"
+            )
         else:
             # 실제 논문 검색
+            with st.spinner("🔍 검색 키워드를 추출하고 있습니다..."):
+                keywords = extract_keywords_with_openai(search_query)
+            
+            status_placeholder = st.empty()
+            st.markdown(f"**검색 키워드:** {', '.join(keywords)}")
+            
+            # 논문 목록 표시
+            st.markdown("""
+            <style>
+                .paper-item {
+                    background-color: white;
+                    padding: 1.5rem;
+                    margin: 1rem 0;
+                    border-radius: 8px;
+                    border: 1px solid #FFD700;
+                }
+                .paper-title {
+                    color: #1a1a1a;
+                    font-size: 1.2rem;
+                    font-weight: bold;
+                    margin-bottom: 0.8rem;
+                }
+                .paper-meta {
+                    color: #666;
+                    font-size: 0.9rem;
+                    margin-bottom: 1rem;
+                }
+                .paper-abstract {
+                    color: #333;
+                    font-size: 1rem;
+                    line-height: 1.6;
+                }
+                .paper-link {
+                    color: #1E88E5;
+                    text-decoration: none;
+                    margin-left: 0.5rem;
+                }
+                .paper-link:hover {
+                    text-decoration: underline;
+                }
+            </style>
+            """, unsafe_allow_html=True)
+            
+            # 키워드별 검색 결과가 도착하는 대로 한 편씩 표시
+            paper_count = 0
             with st.spinner("🔍 논문을 검색하고 있습니다..."):
-                result = search_papers_by_keywords(search_query, DBPIA_API_KEY)
-                
-                if result['papers']:
-                    st.success(f"✅ 총 {len(result['papers'])}개의 관련 논문을 찾았습니다!")
-                    st.markdown(f"**검색 키워드:** {', '.join(result['keywords'])}")
-                    
-                    # 논문 목록 표시
-                    st.markdown("""
-                    <style>
-                        .paper-item {
-                            background-color: white;
-                            padding: 1.5rem;
-                            margin: 1rem 0;
-                            border-radius: 8px;
-                            border: 1px solid #FFD700;
-                        }
-                        .paper-title {
-                            color: #1a1a1a;
-                            font-size: 1.2rem;
-                            font-weight: bold;
-                            margin-bottom: 0.8rem;
-                        }
-                        .paper-meta {
-                            color: #666;
-                            font-size: 0.9rem;
-                            margin-bottom: 1rem;
-                        }
-                        .paper-abstract {
-                            color: #333;
-                            font-size: 1rem;
-                            line-height: 1.6;
-                        }
-                        .paper-link {
-                            color: #1E88E5;
-                            text-decoration: none;
-                            margin-left: 0.5rem;
-                        }
-                        .paper-link:hover {
-                            text-decoration: underline;
-                        }
-                    </style>
-                    """, unsafe_allow_html=True)
+                for paper_count, paper in enumerate(iter_papers_by_keywords(keywords, DBPIA_API_KEY), 1):
+                    # 메타 정보 구성
+                    meta_parts = []
+                    meta_parts.append('🔓 무료' if paper['is_free'] else '🔒 유료')
+                    if paper.get('preview_url'):
+                        meta_parts.append(f'<a href="{paper["preview_url"]}" target="_blank" class="paper-link">미리보기</a>')
+                    if paper.get('link'):
+                        meta_parts.append(f'<a href="{paper["link"]}" target="_blank" class="paper-link">원문 보기</a>')
                     
-                    for i, paper in enumerate(result['papers'], 1):
-                        # 메타 정보 구성
-                        meta_parts = []
-                        meta_parts.append('🔓 무료' if paper['is_free'] else '🔒 유료')
-                        if paper.get('preview_url'):
-                            meta_parts.append(f'<a href="{paper["preview_url"]}" target="_blank" class="paper-link">미리보기</a>')
-                        if paper.get('link'):
-                            meta_parts.append(f'<a href="{paper["link"]}" target="_blank" class="paper-link">원문 보기</a>')
-                        
-                        st.markdown(f"""
-                        <div class="paper-item">
-                            <div class="paper-title">📄 {i}. {paper['title']}</div>
-                            <div class="paper-meta">{' | '.join(meta_parts)}</div>
-                            <div class="paper-abstract">
-                                {paper.get('abstract', '초록이 제공되지 않습니다.')}
-                            </div>
+                    st.markdown(f"""
+                    <div class="paper-item">
+                        <div class="paper-title">📄 {paper_count}. {paper['title']}</div>
+                        <div class="paper-meta">{' | '.join(meta_parts)}</div>
+                        <div class="paper-abstract">
+                            {paper.get('abstract', '초록이 제공되지 않습니다.')}
                         </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    st.error("❌ 관련 논문을 찾지 못했습니다.")
+                    </div>
+                    """, unsafe_allow_html=True)
+            
+            if paper_count:
+                status_placeholder.success(f"✅ 총 {paper_count}개의 관련 논문을 찾았습니다!")
+            else:
+                status_placeholder.error("❌ 관련 논문을 찾지 못했습니다.")
 
 with tabs[1]:
     st.markdown("## 📚 내가 지금까지 생성한 괴논문 모음")
     
-    # Load all generated papers
-    generated_papers = load_generated_papers()
-    
-    if not generated_papers:
-        st.info("아직 생성된 논문이 없습니다. AI 검색 탭에서 논문을 생성해보세요!")
+    paper_store = load_paper_store()
+    archive_query = st.text_input(
+        "🔎 보관함 검색",
+        placeholder="제목, 초록, 본문에서 찾을 단어를 입력하세요",
+        key="archive_query"
+    ).strip()
+    
+    if archive_query:
+        # 검색 결과는 관련도 순으로 한 번에 보여줌
+        page = paper_store.search_papers(archive_query, limit=ARCHIVE_SEARCH_LIMIT)
+        if not page:
+            st.info(f"'{archive_query}'에 해당하는 논문이 없습니다.")
+        else:
+            st.caption(f"검색 결과 {len(page)}개")
+            render_archive_list(paper_store, page)
     else:
-        # Sort papers by generation date (newest first)
-        generated_papers.sort(key=lambda x: x["generated_at"], reverse=True)
+        # 현재 페이지의 제목만 가져오고, 본문은 펼친 논문만 따로 불러옴
+        cursors = st.session_state.archive_cursors
+        page = paper_store.list_paper_page(ARCHIVE_PAGE_SIZE + 1, before=cursors[-1])
+        has_next_page = len(page) > ARCHIVE_PAGE_SIZE
+        page = page[:ARCHIVE_PAGE_SIZE]
         
-        for paper in generated_papers:
-            with st.expander(f"📄 {paper['title']} ({datetime.fromisoformat(paper['generated_at']).strftime('%Y-%m-%d %H:%M')})"):
-                st.markdown(f"**검색어:** {paper['search_query']}")
-                
-                # Paper content tabs
-                paper_tabs = st.tabs(["초록", "본문", "AI 리액션"])
-                
-                with paper_tabs[0]:
-                    st.markdown(paper["abstract"])
-                
-                with paper_tabs[1]:
-                    st.markdown("### 1. 서론")
-                    st.markdown(paper["introduction"])
-                    st.markdown("### 2. 이론적 배경")
-                    st.markdown(paper["background"])
-                    st.markdown("### 3. 연구 방법")
-                    st.markdown(paper["method"])
-                    st.markdown("### 4. 연구 결과")
-                    st.markdown(paper["results"])
-                    st.markdown("### 5. 결론")
-                    st.markdown(paper["conclusion"])
-                    st.markdown("### 참고문헌")
-                    references = paper["references"].split('\n')
-                    for ref in references:
-                        if ref.strip():
-                            st.markdown(f"- {ref}")
-                
-                with paper_tabs[2]:
-                    # Generate real-time reaction
-                    reaction = generate_reaction(paper["title"], paper["abstract"])
-                    gif_url = get_reaction_gif(reaction)
-                    
-                    st.markdown(f"### 🤖 AI의 리액션")
-                    st.markdown(reaction)
-                    if gif_url:
-                        st.image(gif_url, width=300)
-                
-                # Download button
-                paper_content = f"""제목: {paper['title']}\n\n
-[초록]\n{paper['abstract']}\n\n
-[1. 서론]\n{paper['introduction']}\n\n
-[2. 이론적 배경]\n{paper['background']}\n\n
-[3. 연구 방법]\n{paper['method']}\n\n
-[4. 연구 결과]\n{paper['results']}\n\n
-[5. 결론]\n{paper['conclusion']}\n\n
-[참고문헌]\n{paper['references']}""" 
-                
-                st.download_button(
-                    label="📥 논문 다운로드",
-                    data=paper_content,
-                    file_name=f"generated_paper_{paper['search_query'][:30]}.txt",
-                    mime="text/plain",
-                    key=f"download_stored_{paper['paper_id']}"
+        if not page and len(cursors) == 1:
+            st.info("아직 생성된 논문이 없습니다. AI 검색 탭에서 논문을 생성해보세요!")
+        else:
+            render_archive_list(paper_store, page)
+            
+            # 페이지 이동 (키셋 페이지네이션)
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                st.button(
+                    "◀ 이전",
+                    key="archive_prev",
+                    disabled=len(cursors) == 1,
+                    on_click=go_to_previous_archive_page
+                )
+            with page_col:
+                st.caption(f"{len(cursors)} 페이지")
+            with next_col:
+                st.button(
+                    "다음 ▶",
+                    key="archive_next",
+                    disabled=not has_next_page,
+                    on_click=go_to_next_archive_page,
+                    args=((page[-1]['generated_at'], page[-1]['paper_id']) if page else None,)
                 )
 
 with tabs[2]: